@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from cluster import assign, cargar_modelos
+from prism import (_matriz_coincidencias, _reglas_para_clase, columnas_cat, guardar_reglas_json, reglas_a_json,
+                   reglas_desde_json)
+from reglasBinarias import guardar_reglas_binario
+from tablaInferencia import huella_archivo
+
+# Actualización incremental de las reglas PRISM con nuevas observaciones.
+#
+# PRISM solo depende de cuántas filas hay de cada combinación de valores de
+# los atributos y de cada clase, no de las filas en sí. Por eso el histórico
+# se resume una vez en una tabla de conteos (combinación x clase), que tiene
+# como mucho 4^6 x clases filas aunque el CSV crezca, y se guarda en
+# conteos_prism.npz. Con cada lote de filas nuevas:
+#
+#   1. Se asignan sus categorías *_cat con los centroides de modelos_cluster.json.
+#   2. Se buscan las reglas que violan (la regla se cumple pero la clase es
+#      otra) y las filas que quedan sin cubrir por ninguna regla de su clase.
+#   3. Se suman las filas nuevas a la tabla de conteos.
+#   4. Solo las clases afectadas se vuelven a entrenar, sobre la tabla de
+#      conteos, y su bloque de reglas se sustituye en la lista.
+#   5. Se guarda un diff con las reglas eliminadas y añadidas de cada clase.
+#
+# El coste depende del tamaño del lote y del número de combinaciones
+# distintas, no del tamaño del histórico. Con --todas se reentrenan todas las
+# clases y el resultado es idéntico a volver a ejecutar prism.py sobre el
+# histórico completo.
+#
+# Uso:
+#     python actualizacionIncremental.py nuevas.csv
+#     python actualizacionIncremental.py nuevas.csv --historico weather_prediction_clusterizado.csv --todas
+
+
+class TablaConteos:
+    def __init__(self, atributos, valores, clases, combinaciones, clase_ids, conteos, meta=None):
+        self.atributos = list(atributos)
+        self.valores = [list(v) for v in valores]  # valores de cada atributo en orden de aparición
+        self.clases = list(clases)                 # clases en orden de aparición
+        self.combinaciones = combinaciones         # (K, atributos) códigos, 0 = nulo
+        self.clase_ids = clase_ids                 # (K,) índice en clases, -1 = nulo
+        self.conteos = conteos                     # (K,) filas de cada combinación y clase
+        self.meta = meta or {"actualizaciones": []}
+
+    @property
+    def filas(self):
+        return int(self.conteos.sum())
+
+    # pd.factorize numera los valores en orden de aparición, igual que
+    # prism_rapido. Los valores que no estaban en el histórico se añaden al
+    # final, que es el orden en que aparecerían en el CSV ampliado.
+    @staticmethod
+    def _codificar(columna, conocidos):
+        codes, uniques = pd.factorize(columna)
+        indice = {valor: posicion for posicion, valor in enumerate(conocidos)}
+        traduccion = np.empty(len(uniques), dtype=np.int64)
+        for posicion, valor in enumerate(uniques.tolist()):
+            if valor not in indice:
+                indice[valor] = len(conocidos)
+                conocidos.append(valor)
+            traduccion[posicion] = indice[valor]
+        return np.where(codes < 0, -1, traduccion[codes])
+
+    @classmethod
+    def desde_dataframe(cls, df, class_attr='Clima', atributos=None):
+        tabla = cls(columnas_cat if atributos is None else atributos, [], [], None, None, None)
+        tabla.valores = [[] for _ in tabla.atributos]
+        tabla.combinaciones = np.zeros((0, len(tabla.atributos)), dtype=np.int16)
+        tabla.clase_ids = np.zeros(0, dtype=np.int16)
+        tabla.conteos = np.zeros(0, dtype=np.int64)
+        tabla.agregar(df, class_attr)
+        return tabla
+
+    def agregar(self, df, class_attr='Clima'):
+        # Suma las filas de df a la tabla (solo se recorre df)
+        combinaciones = np.column_stack([self._codificar(df[attr], valores) + 1
+                                         for attr, valores in zip(self.atributos, self.valores)])
+        clase_ids = self._codificar(df[class_attr], self.clases)
+        combinaciones = np.concatenate([self.combinaciones, combinaciones.astype(np.int16)])
+        clase_ids = np.concatenate([self.clase_ids, clase_ids.astype(np.int16)])
+        conteos = np.concatenate([self.conteos, np.ones(len(df), dtype=np.int64)])
+
+        # Agrupar las filas repetidas (combinación, clase)
+        dims = [len(v) + 1 for v in self.valores] + [len(self.clases) + 1]
+        claves = np.ravel_multi_index(list(combinaciones.T) + [clase_ids + 1], dims)
+        claves, inverse = np.unique(claves, return_inverse=True)
+        conteos = np.bincount(inverse.reshape(-1), weights=conteos, minlength=len(claves)).astype(np.int64)
+        partes = np.unravel_index(claves, dims)
+        self.combinaciones = np.column_stack(partes[:-1]).astype(np.int16)
+        self.clase_ids = (partes[-1] - 1).astype(np.int16)
+        self.conteos = conteos
+
+    def reglas_clase(self, target_class):
+        # Mismas reglas que prism_rapido daría para la clase sobre las filas originales
+        es_clase = self.clase_ids == self.clases.index(target_class)
+        codigos = [self.combinaciones[:, a].astype(np.intp) for a in range(len(self.atributos))]
+        reglas = _reglas_para_clase(codigos, self.valores, es_clase, pesos=self.conteos)
+        return [([(self.atributos[a], self.valores[a][code - 1]) for a, code in rule_conditions], target_class)
+                for rule_conditions in reglas]
+
+    def guardar(self, filename):
+        meta = dict(self.meta, atributos=self.atributos, valores=self.valores, clases=self.clases)
+        np.savez(filename, combinaciones=self.combinaciones, clase_ids=self.clase_ids, conteos=self.conteos,
+                 meta=np.array(json.dumps(meta, ensure_ascii=False)))
+
+    @classmethod
+    def cargar(cls, filename):
+        with np.load(filename) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(meta.pop('atributos'), meta.pop('valores'), meta.pop('clases'),
+                       data['combinaciones'], data['clase_ids'], data['conteos'], meta)
+
+
+def bloques_por_clase(rules):
+    # {clase: (inicio, fin)} del bloque contiguo de reglas de cada clase
+    bloques = {}
+    for index, (_, target_class) in enumerate(rules):
+        if target_class in bloques:
+            inicio, fin = bloques[target_class]
+            if fin != index:
+                raise ValueError(f"Las reglas de la clase {target_class!r} no son contiguas")
+            bloques[target_class] = (inicio, index + 1)
+        else:
+            bloques[target_class] = (index, index + 1)
+    return bloques
+
+
+def revisar_reglas(rules, df, class_attr='Clima'):
+    # Reglas violadas por las filas nuevas y filas que no cumple ninguna regla
+    # de su clase. Se trabaja por pares (combinación, clase) distintos.
+    matches, inverse = _matriz_coincidencias(rules, df)
+    clase_regla = np.array([target_class for _, target_class in rules], dtype=object)
+    clases = df[class_attr].to_numpy(dtype=object)
+
+    pares = pd.DataFrame({'combinacion': inverse, 'clase': clases})
+    conteo_pares = pares.value_counts(sort=False, dropna=False)
+    violadas = np.zeros(len(rules), dtype=bool)
+    sin_cubrir = {}
+    for (combinacion, clase), filas in conteo_pares.items():
+        cumple = matches[combinacion]
+        de_su_clase = clase_regla == clase
+        violadas |= cumple & ~de_su_clase
+        if not (cumple & de_su_clase).any():
+            sin_cubrir[clase] = sin_cubrir.get(clase, 0) + int(filas)
+    return np.flatnonzero(violadas), sin_cubrir
+
+
+def actualizar_reglas(rules, tabla, nuevas, class_attr='Clima', todas=False):
+    # Devuelve las nuevas reglas y el diff. nuevas debe tener las columnas *_cat.
+    violadas, sin_cubrir = revisar_reglas(rules, nuevas, class_attr)
+    # assign() marca los valores nulos con -1; en la tabla cuentan como nulos
+    nulos = {attr: nuevas[attr].astype('Int64').mask(nuevas[attr] < 0)
+             for attr in tabla.atributos if pd.api.types.is_integer_dtype(nuevas[attr])}
+    tabla.agregar(nuevas.assign(**nulos), class_attr)
+
+    bloques = bloques_por_clase(rules)
+    if todas:
+        afectadas = list(tabla.clases)
+    else:
+        afectadas = {rules[index][1] for index in violadas} | {c for c in sin_cubrir if pd.notna(c)}
+        afectadas = [clase for clase in tabla.clases if clase in afectadas]
+
+    # Las clases nuevas van al final, en el orden en que aparecen (como en prism_rapido)
+    orden = list(bloques) + [clase for clase in tabla.clases if clase not in bloques]
+    nuevas_reglas = []
+    diff = []
+    for clase in orden:
+        inicio, fin = bloques.get(clase, (len(rules), len(rules)))
+        anteriores = rules[inicio:fin]
+        if clase not in afectadas:
+            nuevas_reglas.extend(anteriores)
+            continue
+        reentrenadas = tabla.reglas_clase(clase)
+        claves_anteriores = [json.dumps(r, ensure_ascii=False) for r in reglas_a_json(anteriores)]
+        claves_nuevas = [json.dumps(r, ensure_ascii=False) for r in reglas_a_json(reentrenadas)]
+        conjunto_anteriores, conjunto_nuevas = set(claves_anteriores), set(claves_nuevas)
+        diff.append({
+            "clase": clase,
+            "posicion": len(nuevas_reglas) + 1,
+            "reglas_antes": len(anteriores),
+            "reglas_despues": len(reentrenadas),
+            "eliminadas": [json.loads(k) for k in claves_anteriores if k not in conjunto_nuevas],
+            "añadidas": [json.loads(k) for k in claves_nuevas if k not in conjunto_anteriores],
+        })
+        nuevas_reglas.extend(reentrenadas)
+
+    resumen = {
+        "filas_nuevas": len(nuevas),
+        "reglas_violadas": (violadas + 1).tolist(),
+        "filas_sin_cubrir": {str(clase): filas for clase, filas in sin_cubrir.items()},
+        "clases_reentrenadas": afectadas,
+        "cambios": diff,
+    }
+    return nuevas_reglas, resumen
+
+
+def cargar_historico(ruta):
+    # CSV clusterizado o almacén columnar de pipeline.py
+    columnas = columnas_cat + ['Clima']
+    if os.path.isdir(ruta):
+        from almacenColumnar import cargar_columnar
+        return cargar_columnar(ruta, columnas)
+    from cargaDatos import cargar_dataframe
+    return cargar_dataframe(ruta, columnas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Actualizar las reglas PRISM con nuevas observaciones")
+    parser.add_argument("nuevas", help="CSV con las filas nuevas (mismas columnas que weather_prediction.csv)")
+    parser.add_argument("--reglas", default='prism_rules.json')
+    parser.add_argument("--modelos-cluster", default='modelos_cluster.json')
+    parser.add_argument("--conteos", default='conteos_prism.npz',
+                        help="Tabla de conteos del histórico (se crea a partir de --historico si no existe)")
+    parser.add_argument("--historico", default='weather_prediction_clusterizado.csv',
+                        help="CSV clusterizado (o directorio columnar) con el que se entrenaron las reglas")
+    parser.add_argument("--diff", default='prism_rules.diff.json')
+    parser.add_argument("--todas", action='store_true',
+                        help="Reentrenar todas las clases (mismo resultado que un reentrenamiento completo)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    with open(args.reglas, 'r', encoding='utf-8') as f:
+        rules = reglas_desde_json(json.load(f))
+
+    if os.path.exists(args.conteos):
+        tabla = TablaConteos.cargar(args.conteos)
+        if tabla.meta.get("huella_reglas") != huella_archivo(args.reglas):
+            raise ValueError(f"'{args.reglas}' no corresponde a '{args.conteos}': "
+                             f"bórralo para reconstruirlo a partir del histórico")
+    else:
+        tabla = TablaConteos.desde_dataframe(cargar_historico(args.historico))
+        print(f"Tabla de conteos creada a partir de '{args.historico}' "
+              f"({tabla.filas} filas, {len(tabla.conteos)} combinaciones).")
+
+    huella_nuevas = huella_archivo(args.nuevas)
+    if huella_nuevas in tabla.meta["actualizaciones"]:
+        raise ValueError(f"'{args.nuevas}' ya se aplicó a '{args.conteos}'")
+
+    nuevas = pd.read_csv(args.nuevas)
+    for columna, codigos in assign(nuevas, cargar_modelos(args.modelos_cluster)).items():
+        nuevas[columna] = codigos
+
+    nuevas_reglas, resumen = actualizar_reglas(rules, tabla, nuevas, todas=args.todas)
+
+    guardar_reglas_json(nuevas_reglas, args.reglas)
+    guardar_reglas_binario(reglas_a_json(nuevas_reglas), os.path.splitext(args.reglas)[0] + '.bin')
+    with open(args.diff, 'w', encoding='utf-8') as f:
+        json.dump(resumen, f, ensure_ascii=False, indent=4)
+    tabla.meta["actualizaciones"].append(huella_nuevas)
+    tabla.meta["huella_reglas"] = huella_archivo(args.reglas)
+    tabla.guardar(args.conteos)
+
+    print(f"{resumen['filas_nuevas']} filas nuevas: {len(resumen['reglas_violadas'])} reglas violadas, "
+          f"{sum(resumen['filas_sin_cubrir'].values())} filas sin cubrir.")
+    for cambio in resumen["cambios"]:
+        print(f"  {cambio['clase']}: {cambio['reglas_antes']} -> {cambio['reglas_despues']} reglas "
+              f"(-{len(cambio['eliminadas'])} +{len(cambio['añadidas'])})")
+    print(f"{len(rules)} -> {len(nuevas_reglas)} reglas, diff en '{args.diff}' "
+          f"({time.perf_counter() - inicio:.2f} s).")
+
+
+if __name__ == "__main__":
+    main()
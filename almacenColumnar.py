@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Almacén columnar para DataFrames intermedios: un directorio con un archivo
+# .npy por columna y un meta.json con el orden, el tipo y, para las columnas
+# de texto, las categorías. Leerlo no requiere analizar texto y, con
+# mmap=True, los arrays son vistas sobre archivos mapeados en memoria.
+
+META = 'meta.json'
+
+
+def guardar_columnar(df, directorio):
+    # Se escribe en un directorio temporal y se renombra al final para que un
+    # fallo a medias nunca deje un almacén incompleto
+    temporal = directorio.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+
+    columnas = []
+    for indice, nombre in enumerate(df.columns):
+        serie = df[nombre]
+        archivo = f'{indice:03d}.npy'
+        if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object:
+            categorias = serie.astype('category').cat
+            np.save(os.path.join(temporal, archivo), categorias.codes.to_numpy())
+            columnas.append({'nombre': nombre, 'archivo': archivo, 'tipo': 'categoria',
+                             'categorias': categorias.categories.tolist()})
+        else:
+            np.save(os.path.join(temporal, archivo), serie.to_numpy())
+            columnas.append({'nombre': nombre, 'archivo': archivo, 'tipo': str(serie.dtype)})
+
+    with open(os.path.join(temporal, META), 'w', encoding='utf-8') as f:
+        json.dump({'filas': len(df), 'columnas': columnas}, f, ensure_ascii=False, indent=4)
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.replace(temporal, directorio)
+
+
+def cargar_arrays(directorio, columnas=None, mmap=True):
+    # Devuelve {columna: array}. Las columnas categóricas se devuelven como
+    # pd.Categorical construido sobre los códigos guardados.
+    with open(os.path.join(directorio, META), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    arrays = {}
+    for columna in meta['columnas']:
+        if columnas is not None and columna['nombre'] not in columnas:
+            continue
+        datos = np.load(os.path.join(directorio, columna['archivo']), mmap_mode='r' if mmap else None)
+        if columna['tipo'] == 'categoria':
+            datos = pd.Categorical.from_codes(datos, categories=columna['categorias'])
+        arrays[columna['nombre']] = datos
+    if columnas is not None:
+        faltan = [c for c in columnas if c not in arrays]
+        if faltan:
+            raise KeyError(f"Columnas inexistentes en '{directorio}': {faltan}")
+        arrays = {c: arrays[c] for c in columnas}
+    return arrays
+
+
+def cargar_columnar(directorio, columnas=None, mmap=True):
+    return pd.DataFrame(cargar_arrays(directorio, columnas, mmap), copy=False)
+
+
+def existe_columnar(directorio):
+    return os.path.exists(os.path.join(directorio, META))
@@ -0,0 +1,54 @@
+# apply_rules (iterrows + bucle sobre reglas) frente a apply_rules_vectorizado
+# sobre el dataset clusterizado, con comprobación de que las predicciones
+# coinciden, y tiempo de cálculo de las estadísticas por regla.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_apply_rules
+import argparse
+import time
+
+import pandas as pd
+
+from logicaDifusa import load_rules
+from prism import apply_rules, apply_rules_vectorizado, columnas_cat, estadisticas_reglas
+
+
+def reglas_desde_json(rules_json):
+    return [([(a["attribute"], a["value"]) for a in rule["antecedent"]], rule["consequent"]["value"])
+            for rule in rules_json]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="apply_rules fila a fila frente a vectorizado")
+    parser.add_argument("--csv", default="weather_prediction_clusterizado.csv")
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--filas", type=int, default=None,
+                        help="Limitar la versión fila a fila a las primeras filas")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)[columnas_cat + ['Clima']]
+    rules = reglas_desde_json(load_rules(args.reglas))
+    muestra = df if args.filas is None else df.iloc[:args.filas]
+
+    inicio = time.perf_counter()
+    fila_a_fila = apply_rules(rules, muestra)
+    t_filas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorizado = apply_rules_vectorizado(rules, muestra)
+    t_vector = time.perf_counter() - inicio
+    if fila_a_fila != vectorizado:
+        raise AssertionError("Las predicciones difieren")
+
+    inicio = time.perf_counter()
+    estadisticas_reglas(rules, df, 'Clima')
+    t_estadisticas = time.perf_counter() - inicio
+
+    print(f"Filas: {len(muestra)}  Reglas: {len(rules)}")
+    print(f"apply_rules:             {t_filas:8.3f} s")
+    print(f"apply_rules_vectorizado: {t_vector:8.3f} s  ({t_filas / t_vector:.0f}x)")
+    print(f"estadisticas_reglas ({len(df)} filas): {t_estadisticas:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Tiempo de carga de las reglas: prism_rules.json (json.load + compilación del
+# índice) frente a prism_rules.bin (mapeo en memoria + compilación desde
+# arrays), comprobando que ambos índices son idénticos.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_carga_reglas
+import argparse
+import time
+
+from logicaDifusa import compile_rules, load_rules
+
+
+def medir(funcion, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de reglas JSON frente a binario")
+    parser.add_argument("--json", default="prism_rules.json")
+    parser.add_argument("--binario", default="prism_rules.bin")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    rules_json, t_parse = medir(lambda: load_rules(args.json), args.repeticiones)
+    desde_json, t_json = medir(lambda: compile_rules(load_rules(args.json)), args.repeticiones)
+    desde_binario, t_binario = medir(lambda: load_rules(args.binario), args.repeticiones)
+
+    if (desde_json.consequents != desde_binario.consequents or desde_json.free != desde_binario.free
+            or desde_json.by_value != desde_binario.by_value):
+        raise AssertionError("Los índices compilados difieren")
+
+    print(f"Reglas: {len(rules_json)}")
+    print(f"JSON, solo json.load:       {t_parse * 1e3:8.2f} ms")
+    print(f"JSON, carga + compilación:  {t_json * 1e3:8.2f} ms")
+    print(f"Binario, carga + índice:    {t_binario * 1e3:8.2f} ms  ({t_json / t_binario:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Tiempo de clusterización por columna con KMeans de sklearn (método actual),
+# k-means 1-D exacto y MiniBatchKMeans. Para cada método se muestra la
+# coincidencia de etiquetas con KMeans tras el mejor reetiquetado, la suma de
+# cuadrados dentro de los grupos (el exacto nunca puede ser peor) y el tiempo
+# relativo al de KMeans.
+#
+# Falla si el exacto da una suma de cuadrados mayor que KMeans, o si con la
+# misma suma de cuadrados (diferencia menor que --tolerancia-sse) sus
+# etiquetas coinciden en menos de --coincidencia-minima. Cuando KMeans se
+# queda en un mínimo local peor (p. ej. cloud_cover) la coincidencia baja
+# legítimamente y solo se muestra.
+#
+# Como el coste del exacto depende del número de valores distintos y no de
+# las filas, también se mide sobre columnas sintéticas de --distintos valores
+# reales distintos, donde además falla si tarda más de --limite-segundos. En
+# las columnas del dataset (pocos valores distintos) el exacto es varias veces
+# más rápido que KMeans; con todos los valores distintos es más lento.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_cluster --replicas 1 10 --distintos 10000 100000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cluster import coincidencia_etiquetas, columnas, etiquetas_columna, n_clusters
+
+
+def suma_cuadrados(valores, etiquetas):
+    total = 0.0
+    for etiqueta in np.unique(etiquetas):
+        grupo = valores[etiquetas == etiqueta]
+        total += ((grupo - grupo.mean()) ** 2).sum()
+    return total
+
+
+def comprobar(nombre, sse_exacto, sse_kmeans, coincidencia, args):
+    if sse_exacto > sse_kmeans * (1 + 1e-9):
+        raise AssertionError(f"{nombre}: el k-means exacto da una suma de cuadrados mayor que KMeans")
+    if sse_exacto >= sse_kmeans * (1 - args.tolerancia_sse) and coincidencia < args.coincidencia_minima:
+        raise AssertionError(f"{nombre}: con la misma suma de cuadrados las etiquetas solo coinciden "
+                             f"en un {coincidencia:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KMeans de sklearn frente a k-means 1-D exacto y MiniBatchKMeans")
+    parser.add_argument("--csv", default="weather_prediction.csv")
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1])
+    parser.add_argument("--distintos", type=int, nargs="+", default=[10_000, 30_000],
+                        help="Tamaños de las columnas sintéticas con todos los valores distintos")
+    parser.add_argument("--limite-segundos", type=float, default=2.0)
+    parser.add_argument("--coincidencia-minima", type=float, default=0.9)
+    parser.add_argument("--tolerancia-sse", type=float, default=0.01,
+                        help="Diferencia relativa de suma de cuadrados por debajo de la cual se exige coincidencia")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, usecols=columnas)
+    # La primera llamada a KMeans carga sklearn y sus hilos: no se mide
+    etiquetas_columna(df[columnas[0]].to_numpy(dtype=np.float64), n_clusters, 'kmeans')
+    for replicas in args.replicas:
+        datos = pd.concat([df] * replicas, ignore_index=True)
+        print(f"Filas: {len(datos)}")
+        print(f"{'columna':>14} {'método':>10} {'tiempo':>9} {'/ kmeans':>9} {'coincidencia':>13} "
+              f"{'SSE / SSE kmeans':>17}")
+        for columna in columnas:
+            valores = datos[columna].to_numpy(dtype=np.float64)
+            referencia = None
+            for metodo in ('kmeans', 'exacto', 'minibatch'):
+                inicio = time.perf_counter()
+                etiquetas = etiquetas_columna(valores, n_clusters, metodo)
+                segundos = time.perf_counter() - inicio
+                sse = suma_cuadrados(valores, etiquetas)
+                if referencia is None:
+                    referencia = (etiquetas, sse, segundos)
+                coincidencia = coincidencia_etiquetas(referencia[0], etiquetas)
+                print(f"{columna:>14} {metodo:>10} {segundos:8.3f}s {segundos / referencia[2]:8.2f}x "
+                      f"{coincidencia:12.2%} {sse / referencia[1]:17.4f}")
+                if metodo == 'exacto':
+                    comprobar(columna, sse, referencia[1], coincidencia, args)
+
+    rng = np.random.default_rng(0)
+    for distintos in args.distintos:
+        valores = rng.normal(size=distintos)
+        print(f"Columna sintética con {distintos} valores distintos")
+        tiempos = {}
+        sse = {}
+        etiquetas = {}
+        for metodo in ('kmeans', 'exacto'):
+            inicio = time.perf_counter()
+            etiquetas[metodo] = etiquetas_columna(valores, n_clusters, metodo)
+            tiempos[metodo] = time.perf_counter() - inicio
+            sse[metodo] = suma_cuadrados(valores, etiquetas[metodo])
+            print(f"{metodo:>10} {tiempos[metodo]:8.3f}s {tiempos[metodo] / tiempos['kmeans']:8.2f}x  "
+                  f"SSE {sse[metodo]:.6f}")
+        coincidencia = coincidencia_etiquetas(etiquetas['kmeans'], etiquetas['exacto'])
+        print(f"{'':>10} coincidencia {coincidencia:.2%}")
+        comprobar(f"sintética de {distintos}", sse['exacto'], sse['kmeans'], coincidencia, args)
+        if tiempos['exacto'] > args.limite_segundos:
+            raise AssertionError(f"El k-means exacto tarda {tiempos['exacto']:.2f} s con {distintos} valores distintos")
+
+
+if __name__ == "__main__":
+    main()
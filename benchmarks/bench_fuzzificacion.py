@@ -0,0 +1,47 @@
+# Compara fuzzify_inputs (llamadas escalares fila a fila) con fuzzify_batch
+# (una pasada vectorizada) sobre weather_prediction.csv y verifica que las
+# categorías obtenidas coinciden.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_fuzzificacion
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from logicaDifusa import INPUT_VARIABLES, fuzzify_batch, fuzzify_inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzificación escalar frente a vectorizada")
+    parser.add_argument("--csv", default="weather_prediction.csv")
+    parser.add_argument("--replicas", type=int, default=1,
+                        help="Número de veces que se replica el dataset")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, usecols=INPUT_VARIABLES)
+    if args.replicas > 1:
+        df = pd.concat([df] * args.replicas, ignore_index=True)
+
+    inicio = time.perf_counter()
+    escalar = [fuzzify_inputs(*fila) for fila in df[INPUT_VARIABLES].itertuples(index=False)]
+    tiempo_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    _, categorias = fuzzify_batch(df)
+    tiempo_lotes = time.perf_counter() - inicio
+
+    for attr, codigos in categorias.items():
+        if not np.array_equal(codigos, [fila[attr] for fila in escalar]):
+            raise AssertionError(f"Categorías distintas en {attr}")
+
+    filas = len(df)
+    print(f"Filas: {filas}")
+    print(f"Escalar:     {tiempo_escalar:8.3f} s  ({filas / tiempo_escalar:12.0f} filas/s)")
+    print(f"Vectorizado: {tiempo_lotes:8.3f} s  ({filas / tiempo_lotes:12.0f} filas/s)")
+    print(f"Aceleración: {tiempo_escalar / tiempo_lotes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
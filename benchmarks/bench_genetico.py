@@ -0,0 +1,68 @@
+# Generaciones por segundo del algoritmo genético original (individuo a
+# individuo) frente al vectorizado, con la información mutua real de las nueve
+# características y con vectores aleatorios de más características.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_genetico --poblaciones 100 1000 10000 --caracteristicas 100 1000
+import argparse
+import time
+
+import numpy as np
+
+from geneticoClima import (algoritmo_genetico, algoritmo_genetico_vectorizado, calculate_mutual_information,
+                           cargar_datos, feature_columns)
+
+
+def generaciones_por_segundo(funcion, generaciones):
+    inicio = time.perf_counter()
+    funcion()
+    return generaciones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Algoritmo genético original frente a vectorizado")
+    parser.add_argument("--csv", default="weather-prediction-with-climate-extended.csv")
+    parser.add_argument("--generaciones", type=int, default=200)
+    parser.add_argument("--poblaciones", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--caracteristicas", type=int, nargs="+", default=[100, 1000],
+                        help="Tamaños de problemas sintéticos con más características")
+    args = parser.parse_args()
+
+    X, y = cargar_datos(args.csv)
+    info_mutua = [calculate_mutual_information(X[col], y) for col in feature_columns]
+    generaciones = args.generaciones
+
+    original = generaciones_por_segundo(
+        lambda: algoritmo_genetico(info_mutua, 100, generaciones, verbose=False), generaciones)
+    print(f"Original,    población 100, {len(info_mutua)} características: {original:10.1f} generaciones/s")
+
+    # Con nueve características el espacio completo (512 subconjuntos) se
+    # agota en pocas generaciones, así que el rendimiento por generación del
+    # motor vectorizado se mide sobre problemas sintéticos más grandes
+    rng = np.random.default_rng(0)
+    for n_caracteristicas in args.caracteristicas:
+        sintetico = rng.random(n_caracteristicas)
+        nombres = [f"f{i}" for i in range(n_caracteristicas)]
+        for poblacion in args.poblaciones:
+            vectorizado = generaciones_por_segundo(
+                lambda: algoritmo_genetico_vectorizado(sintetico, poblacion, generaciones, seed=0,
+                                                       verbose=False, names=nombres),
+                generaciones)
+            print(f"Vectorizado, población {poblacion}, {n_caracteristicas} características: "
+                  f"{vectorizado:10.1f} generaciones/s")
+
+    # Con los valores por defecto (búsqueda exhaustiva para espacios pequeños,
+    # caché de fitness y parada por convergencia) lo que importa es el tiempo
+    # hasta conocer la respuesta
+    inicio = time.perf_counter()
+    algoritmo_genetico_vectorizado(info_mutua, verbose=False)
+    print(f"Por defecto (exhaustivo), {len(info_mutua)} características: "
+          f"{(time.perf_counter() - inicio) * 1e3:.2f} ms hasta la respuesta")
+    inicio = time.perf_counter()
+    algoritmo_genetico_vectorizado(info_mutua, seed=0, verbose=False, exhaustivo_hasta=0, paciencia=100)
+    print(f"Genético con caché y paciencia 100, {len(info_mutua)} características: "
+          f"{(time.perf_counter() - inicio) * 1e3:.2f} ms hasta la respuesta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Coste por fila de la inferencia difusa graduada (mínimo y producto) frente
+# a la inferencia nítida: recorrido de la lista de reglas fila a fila
+# (fuzzify_inputs -> infer_consequent) y predict_batch. Comprueba además que
+# con membresías nítidas (1 en la categoría ganadora) la inferencia graduada
+# da el mismo valor crisp que predict_batch.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_inferencia_graduada
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from logicaDifusa import (GRADED_TNORMS, INPUT_VARIABLES, GradedRules, compile_rules, fuzzify_batch,
+                          fuzzify_inputs, infer_consequent, load_rules, predict_batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inferencia graduada frente a nítida")
+    parser.add_argument("--csv", default="weather-prediction-with-climate-extended.csv")
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--filas-recorrido", type=int, default=2000,
+                        help="Filas usadas para medir el recorrido fila a fila (es lento)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, usecols=INPUT_VARIABLES)
+    rules = load_rules(args.reglas)
+    compiladas = compile_rules(rules)
+    filas = len(df)
+
+    muestra = df.iloc[:args.filas_recorrido]
+    inicio = time.perf_counter()
+    for fila in muestra[INPUT_VARIABLES].itertuples(index=False):
+        infer_consequent(fuzzify_inputs(*fila), rules)
+    por_fila = (time.perf_counter() - inicio) / len(muestra)
+    print(f"Filas: {filas}  Reglas: {len(rules)}")
+    print(f"Recorrido nítido fila a fila: {por_fila * 1e6:8.1f} µs/fila")
+
+    inicio = time.perf_counter()
+    memberships, categorias = fuzzify_batch(df)
+    _, crisp_nitido = predict_batch(categorias, compiladas)
+    segundos = time.perf_counter() - inicio
+    print(f"predict_batch (nítido):       {segundos / filas * 1e6:8.1f} µs/fila")
+
+    for tnorm in GRADED_TNORMS:
+        graduadas = GradedRules(rules, tnorm)
+        inicio = time.perf_counter()
+        memberships, _ = fuzzify_batch(df)
+        graduadas.predict(memberships)
+        segundos = time.perf_counter() - inicio
+        print(f"Graduada ({tnorm:7s}):          {segundos / filas * 1e6:8.1f} µs/fila")
+
+    nitidas = {var: np.eye(3)[categorias[var + "_cat"]] for var in INPUT_VARIABLES}
+    _, crisp = GradedRules(rules).predict(nitidas)
+    if not np.allclose(crisp, crisp_nitido, equal_nan=True):
+        raise AssertionError("Con membresías nítidas la inferencia graduada no coincide con predict_batch")
+
+
+if __name__ == "__main__":
+    main()
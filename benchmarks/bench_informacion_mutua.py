@@ -0,0 +1,47 @@
+# calculate_mutual_information (Counter sobre pares de Python, columna a
+# columna) frente a informacion_mutua_vectorizada (np.bincount sobre códigos
+# combinados) a medida que crece el número de filas, comprobando que los
+# valores coinciden con tolerancia de coma flotante.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_informacion_mutua --replicas 1 10 50
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from geneticoClima import calculate_mutual_information, cargar_datos, feature_columns, informacion_mutua_vectorizada
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Información mutua con Counter frente a np.bincount")
+    parser.add_argument("--csv", default="weather-prediction-with-climate-extended.csv")
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args()
+
+    X, y = cargar_datos(args.csv)
+    print(f"{'filas':>10} {'Counter':>10} {'bincount':>10} {'aceleración':>12} {'dif. máx.':>10}")
+    for replicas in args.replicas:
+        Xr = pd.concat([X] * replicas, ignore_index=True)
+        yr = pd.concat([y] * replicas, ignore_index=True)
+        original, t_original = cronometrar(
+            lambda: np.array([calculate_mutual_information(Xr[col], yr) for col in feature_columns]))
+        vectorizada, t_vectorizada = cronometrar(
+            lambda: informacion_mutua_vectorizada(Xr[feature_columns], yr, procesos=args.procesos))
+        diferencia = np.max(np.abs(original - vectorizada))
+        if not np.allclose(original, vectorizada, rtol=1e-9, atol=1e-12):
+            raise AssertionError(f"Valores distintos con {len(Xr)} filas")
+        print(f"{len(Xr):10d} {t_original:9.3f}s {t_vectorizada:9.3f}s {t_original / t_vectorizada:11.1f}x "
+              f"{diferencia:10.1e}")
+
+
+if __name__ == "__main__":
+    main()
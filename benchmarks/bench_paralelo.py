@@ -0,0 +1,69 @@
+# Escalabilidad de prediccionLotes con 1, 2, 4 y N procesos sobre el dataset
+# incluido replicado hasta varios millones de filas. Comprueba además que la
+# salida es idéntica byte a byte con cualquier número de procesos.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_paralelo --filas 3000000
+import argparse
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+from logicaDifusa import compile_rules, load_rules
+from prediccionLotes import predecir_csv
+
+
+def replicar_csv(origen, destino, filas_objetivo):
+    df = pd.read_csv(origen)
+    escritas = 0
+    with open(destino, 'w', encoding='utf-8', newline='') as f:
+        while escritas < filas_objetivo:
+            parte = df.iloc[:filas_objetivo - escritas]
+            f.write(parte.to_csv(header=escritas == 0, index=False))
+            escritas += len(parte)
+    return escritas
+
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalabilidad de la predicción por lotes en paralelo")
+    parser.add_argument("--csv", default="weather-prediction-with-climate-extended.csv")
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--filas", type=int, default=3_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rules = compile_rules(load_rules(args.reglas))
+    niveles = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        entrada = os.path.join(tmp, "entrada.csv")
+        filas = replicar_csv(args.csv, entrada, args.filas)
+        print(f"Filas: {filas}  Núcleos disponibles: {os.cpu_count()}")
+
+        referencia = None
+        base = None
+        for procesos in niveles:
+            salida = os.path.join(tmp, f"salida_{procesos}.csv")
+            _, segundos = predecir_csv(entrada, salida, rules, args.chunksize, procesos)
+            huella = sha256(salida)
+            if referencia is None:
+                referencia, base = huella, segundos
+            elif huella != referencia:
+                raise AssertionError(f"La salida con {procesos} procesos difiere de la secuencial")
+            os.remove(salida)
+            print(f"{procesos:3d} procesos: {segundos:8.2f} s  {filas / segundos:12.0f} filas/s"
+                  f"  aceleración {base / segundos:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
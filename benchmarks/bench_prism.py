@@ -0,0 +1,56 @@
+# Tiempo de entrenamiento de prism() (implementación original, copia y filtra
+# el DataFrame en cada paso) frente a prism_rapido() (tablas de conteo sobre
+# atributos codificados) y comprobación de que ambas producen las mismas
+# reglas. La versión original tarda muchos minutos con las 29k filas, así que
+# se compara sobre las primeras --filas filas y la rápida se mide además sobre
+# el dataset completo.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_prism --filas 1000 3000 10000 --procesos 2 4
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from prism import columnas_cat, prism, prism_rapido
+
+
+def cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="prism() frente a prism_rapido()")
+    parser.add_argument("--csv", default="weather_prediction_clusterizado.csv")
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 3000])
+    parser.add_argument("--procesos", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="Número de procesos para el entrenamiento por clase en paralelo")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)[columnas_cat + ['Clima']]
+
+    print(f"{'filas':>8} {'reglas':>7} {'prism':>10} {'prism_rapido':>13} {'aceleración':>12}")
+    for filas in args.filas:
+        muestra = df.iloc[:filas]
+        original, t_original = cronometrar(prism, muestra, 'Clima')
+        rapido, t_rapido = cronometrar(prism_rapido, muestra, 'Clima')
+        if original != rapido:
+            raise AssertionError(f"Las reglas difieren con {filas} filas")
+        print(f"{filas:8d} {len(rapido):7d} {t_original:9.2f}s {t_rapido:12.3f}s {t_original / t_rapido:11.1f}x")
+
+    rapido, t_rapido = cronometrar(prism_rapido, df, 'Clima')
+    print(f"{len(df):8d} {len(rapido):7d} {'-':>10} {t_rapido:12.3f}s")
+
+    for procesos in args.procesos:
+        paralelo, t_paralelo = cronometrar(prism_rapido, df, 'Clima', None, procesos)
+        if paralelo != rapido:
+            raise AssertionError(f"Las reglas difieren con {procesos} procesos")
+        print(f"prism_rapido con {procesos} procesos: {t_paralelo:.3f}s "
+              f"({t_rapido / t_paralelo:.2f}x frente a 1 proceso)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Compara la latencia por consulta de infer_consequent recorriendo la lista de
+# reglas del JSON contra el índice compilado (CompiledRules).
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_reglas
+import argparse
+import itertools
+import time
+
+from logicaDifusa import compile_rules, infer_consequent, load_rules
+
+ATRIBUTOS = ['cloud_cover_cat', 'humidity_cat', 'pressure_cat',
+             'precipitation_cat', 'sunshine_cat', 'temp_mean_cat']
+
+
+def consultas_exhaustivas(valores=range(4)):
+    # Todas las combinaciones posibles de categorías de los seis atributos
+    return [dict(zip(ATRIBUTOS, combinacion))
+            for combinacion in itertools.product(valores, repeat=len(ATRIBUTOS))]
+
+
+def medir(funcion, consultas, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for consulta in consultas:
+            funcion(consulta)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / len(consultas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de infer_consequent: recorrido lineal frente a índice compilado")
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    rules = load_rules(args.reglas)
+    inicio = time.perf_counter()
+    compiled = compile_rules(rules)
+    tiempo_compilacion = time.perf_counter() - inicio
+
+    consultas = consultas_exhaustivas()
+    # Comprobar que ambos caminos devuelven exactamente la misma lista
+    for consulta in consultas:
+        if infer_consequent(consulta, rules) != infer_consequent(consulta, compiled):
+            raise AssertionError(f"Resultados distintos para {consulta}")
+
+    lineal = medir(lambda c: infer_consequent(c, rules), consultas, args.repeticiones)
+    indice = medir(lambda c: infer_consequent(c, compiled), consultas, args.repeticiones)
+
+    print(f"Reglas: {len(rules)}  Consultas: {len(consultas)}")
+    print(f"Compilación del índice: {tiempo_compilacion * 1e3:.2f} ms")
+    print(f"Recorrido lineal:  {lineal * 1e6:9.2f} µs/consulta")
+    print(f"Índice compilado:  {indice * 1e6:9.2f} µs/consulta")
+    print(f"Aceleración: {lineal / indice:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Generador de carga para servicioPrediccion.py: abre --conexiones conexiones
+# persistentes que envían POST /predict sin pausa durante --segundos y
+# muestra las peticiones por segundo sostenidas, la latencia vista por el
+# cliente y las métricas del propio servicio (GET /metrics).
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.carga_servicio --iniciar --conexiones 64 --segundos 10
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+RANGOS = {'humidity': (0, 100), 'cloud_cover': (0, 10), 'pressure': (950, 1050),
+          'precipitation': (0, 300), 'sunshine': (0, 150), 'temp_mean': (-30, 50)}
+
+
+def entrada_aleatoria(generador):
+    return {var: generador.randint(minimo, maximo) for var, (minimo, maximo) in RANGOS.items()}
+
+
+async def peticion(lector, escritor, metodo, ruta, contenido=None):
+    cuerpo = b'' if contenido is None else json.dumps(contenido).encode('utf-8')
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\n"
+                   f"Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1')
+                   + cuerpo)
+    await escritor.drain()
+    estado = int((await lector.readline()).split()[1])
+    longitud = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b'\r\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        if nombre.strip().lower() == 'content-length':
+            longitud = int(valor)
+    return estado, json.loads(await lector.readexactly(longitud))
+
+
+async def cliente(host, puerto, fin, filas_por_peticion, semilla, latencias, errores):
+    generador = random.Random(semilla)
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while time.perf_counter() < fin:
+            if filas_por_peticion == 1:
+                contenido = entrada_aleatoria(generador)
+            else:
+                contenido = [entrada_aleatoria(generador) for _ in range(filas_por_peticion)]
+            inicio = time.perf_counter()
+            estado, _ = await peticion(lector, escritor, 'POST', '/predict', contenido)
+            latencias.append(time.perf_counter() - inicio)
+            if estado != 200:
+                errores.append(estado)
+    finally:
+        escritor.close()
+
+
+async def esperar_servicio(host, puerto, segundos=30):
+    limite = time.perf_counter() + segundos
+    while True:
+        try:
+            _, escritor = await asyncio.open_connection(host, puerto)
+            escritor.close()
+            return
+        except OSError:
+            if time.perf_counter() > limite:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def generar_carga(args):
+    await esperar_servicio(args.host, args.puerto)
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    fin = inicio + args.segundos
+    await asyncio.gather(*(cliente(args.host, args.puerto, fin, args.filas_por_peticion, semilla, latencias, errores)
+                           for semilla in range(args.conexiones)))
+    duracion = time.perf_counter() - inicio
+
+    lector, escritor = await asyncio.open_connection(args.host, args.puerto)
+    _, metricas = await peticion(lector, escritor, 'GET', '/metrics')
+    escritor.close()
+
+    latencias = np.array(latencias) * 1000
+    p50, p99 = np.percentile(latencias, [50, 99])
+    print(f"Conexiones: {args.conexiones}  Filas por petición: {args.filas_por_peticion}  "
+          f"Duración: {duracion:.1f} s")
+    print(f"Peticiones: {len(latencias)}  Errores: {len(errores)}")
+    print(f"QPS sostenidas: {len(latencias) / duracion:,.0f}  "
+          f"Predicciones/s: {len(latencias) * args.filas_por_peticion / duracion:,.0f}")
+    print(f"Latencia cliente: p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+    print("Métricas del servicio:", json.dumps(metricas, ensure_ascii=False, indent=4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para el servicio de predicción")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--conexiones", type=int, default=32)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--filas-por-peticion", type=int, default=1)
+    parser.add_argument("--iniciar", action="store_true",
+                        help="Arrancar servicioPrediccion.py en un subproceso durante la prueba")
+    parser.add_argument("--tabla", action="store_true", help="Con --iniciar, arrancar el servicio con --tabla")
+    args = parser.parse_args()
+
+    servicio = None
+    if args.iniciar:
+        comando = [sys.executable, "servicioPrediccion.py", "--host", args.host, "--puerto", str(args.puerto)]
+        servicio = subprocess.Popen(comando + (["--tabla"] if args.tabla else []), stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(generar_carga(args))
+    finally:
+        if servicio is not None:
+            servicio.terminate()
+            servicio.wait()
+
+
+if __name__ == "__main__":
+    main()
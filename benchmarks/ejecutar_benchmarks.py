@@ -0,0 +1,316 @@
+# Banco de pruebas de extremo a extremo. Ejecuta cada etapa (carga del CSV,
+# clusterización, entrenamiento PRISM, aplicación de reglas, fuzzificación e
+# inferencia, información mutua y algoritmo genético) sobre el dataset
+# incluido y sobre versiones sintéticas escaladas (--escalas 1 10 100: el
+# dataset repetido N veces con ruido de ±1 unidad en las columnas numéricas
+# de las copias). Para cada variante guarda en un JSON el tiempo (mejor de
+# --repeticiones), el pico de memoria de tracemalloc, el rendimiento y los
+# contadores de instrumentacion.py, junto con el commit de git, para poder
+# comparar resultados entre commits con --comparar.
+#
+# El pico de memoria y los contadores se obtienen en una ejecución adicional
+# con tracemalloc y la instrumentación activadas, para que su coste no afecte
+# al tiempo medido. tracemalloc ve las asignaciones de Python y de numpy, no
+# las internas de bibliotecas nativas como sklearn. Las variantes fila a fila
+# (implementaciones originales) se miden sobre las primeras --filas-muestra
+# filas y solo en la primera escala. Con x100 la ejecución completa tarda
+# del orden de media hora, casi toda en PRISM (--etapas para elegir).
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.ejecutar_benchmarks --escalas 1 10 100
+#     python -m benchmarks.ejecutar_benchmarks --etapas prism apply_rules --comparar resultados_benchmarks/anterior.json
+import argparse
+import datetime
+import gc
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import instrumentacion
+from almacenColumnar import cargar_arrays, guardar_columnar
+from cargaDatos import leer_csv_compacto
+from cluster import clusterizar, columnas as columnas_cluster, n_clusters
+from geneticoClima import (algoritmo_genetico, algoritmo_genetico_vectorizado, calculate_mutual_information,
+                           feature_columns, informacion_mutua_vectorizada, target_column)
+from logicaDifusa import (INPUT_VARIABLES, GradedRules, compile_rules, fuzzify_batch, fuzzify_inputs,
+                          infer_consequent, load_rules, predict_batch)
+from prism import (apply_rules, apply_rules_vectorizado, columnas_cat, estadisticas_reglas, prism, prism_rapido,
+                   reglas_desde_json)
+from tablaInferencia import cargar_tabla
+
+COLUMNAS_CRUDAS = ['cloud_cover', 'humidity', 'pressure', 'global_radiation', 'precipitation', 'sunshine',
+                   'temp_mean', 'temp_min', 'temp_max']
+
+
+def escalar(df, factor, seed=0):
+    # Las copias llevan ruido de ±1 en las columnas numéricas crudas (enteros)
+    # para que no sean filas idénticas; las categorías y la clase se mantienen
+    if factor == 1:
+        return df
+    rng = np.random.default_rng(seed)
+    escalado = pd.concat([df] * factor, ignore_index=True)
+    ruido = rng.integers(-1, 2, size=(len(escalado), len(COLUMNAS_CRUDAS)))
+    ruido[:len(df)] = 0
+    for i, columna in enumerate(COLUMNAS_CRUDAS):
+        escalado[columna] = escalado[columna].to_numpy() + ruido[:, i]
+    return escalado
+
+
+def info_git():
+    def git(*args):
+        try:
+            return subprocess.run(('git',) + args, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    estado = git('status', '--porcelain', '--untracked-files=no')
+    return {"commit": git('rev-parse', 'HEAD'), "rama": git('rev-parse', '--abbrev-ref', 'HEAD'),
+            "cambios_sin_commit": bool(estado) if estado is not None else None}
+
+
+def caso(variante, ejecutar, cantidad, unidad='filas'):
+    return {"variante": variante, "ejecutar": ejecutar, "cantidad": cantidad, "unidad": unidad}
+
+
+# --- Etapas ---
+# Cada etapa recibe el contexto y devuelve sus casos. El trabajo previo
+# (cargar reglas, escribir el CSV escalado, ...) se hace aquí, fuera de la medida.
+
+def etapa_carga(ctx):
+    ruta = os.path.join(ctx["temporal"], f"escala_{ctx['escala']}.csv")
+    almacen = os.path.join(ctx["temporal"], f"escala_{ctx['escala']}.columnar")
+    ctx["df"].to_csv(ruta, index=False)
+    guardar_columnar(leer_csv_compacto(ruta), almacen)
+    filas = len(ctx["df"])
+
+    def columnar():
+        # Se recorren todas las columnas para que el mapeo se lea de disco
+        for valores in cargar_arrays(almacen).values():
+            np.asarray(getattr(valores, 'codes', valores)).sum()
+
+    return [caso("pandas.read_csv", lambda: pd.read_csv(ruta), filas),
+            caso("leer_csv_compacto", lambda: leer_csv_compacto(ruta), filas),
+            caso("almacen_columnar_mmap", columnar, filas)]
+
+
+def etapa_cluster(ctx):
+    # cluster.py importa sklearn al ajustar: se carga antes para que el tiempo
+    # de importación no entre en la medida (no se usa el módulo aquí)
+    importlib.import_module("sklearn.cluster")
+
+    crudo = ctx["df"][columnas_cluster]
+    return [caso(f"clusterizar.{metodo}",
+                 lambda metodo=metodo: clusterizar(crudo.copy(), columnas_cluster, n_clusters, metodo, ctx["procesos"]),
+                 len(crudo))
+            for metodo in ctx["metodos_cluster"]]
+
+
+def etapa_prism(ctx):
+    df = ctx["df"][columnas_cat + ['Clima']]
+    casos = [caso("prism_rapido", lambda: prism_rapido(df, 'Clima', procesos=ctx["procesos"]), len(df))]
+    if ctx["muestras"]:
+        muestra = df.iloc[:ctx["filas_prism"]]
+        casos.append(caso("prism_original (muestra)", lambda: prism(muestra, 'Clima'), len(muestra)))
+    return casos
+
+
+def etapa_apply_rules(ctx):
+    df = ctx["df"][columnas_cat + ['Clima']]
+    rules = ctx["reglas_prism"]
+    casos = [caso("apply_rules_vectorizado", lambda: apply_rules_vectorizado(rules, df), len(df)),
+             caso("estadisticas_reglas", lambda: estadisticas_reglas(rules, df), len(df))]
+    if ctx["muestras"]:
+        muestra = df.iloc[:ctx["filas_muestra"]]
+        casos.append(caso("apply_rules (muestra)", lambda: apply_rules(rules, muestra), len(muestra)))
+    return casos
+
+
+def etapa_inferencia(ctx):
+    datos = {var: ctx["df"][var].to_numpy() for var in INPUT_VARIABLES}
+    filas = len(ctx["df"])
+    rules = ctx["reglas"]
+    compiladas = compile_rules(rules)
+    tabla = cargar_tabla(ctx["archivo_reglas"])
+    graduadas = GradedRules(rules, "min")
+
+    def fila_a_fila(reglas, muestra):
+        for fila in muestra.itertuples(index=False):
+            infer_consequent(fuzzify_inputs(*fila), reglas)
+
+    casos = [caso("fuzzify_batch", lambda: fuzzify_batch(datos), filas),
+             caso("fuzzify_batch+predict_batch", lambda: predict_batch(fuzzify_batch(datos)[1], compiladas), filas),
+             caso("fuzzify_batch+tabla", lambda: tabla.predict(fuzzify_batch(datos)[1]), filas),
+             caso("fuzzify_batch+graduada_min", lambda: graduadas.predict(fuzzify_batch(datos)[0]), filas)]
+    if ctx["muestras"]:
+        muestra = ctx["df"][INPUT_VARIABLES].iloc[:ctx["filas_muestra"]]
+        casos += [caso("fila_a_fila.lista (muestra)", lambda: fila_a_fila(rules, muestra), len(muestra)),
+                  caso("fila_a_fila.compiladas (muestra)", lambda: fila_a_fila(compiladas, muestra), len(muestra))]
+    return casos
+
+
+def etapa_informacion_mutua(ctx):
+    X = ctx["df"][feature_columns]
+    y = ctx["df"][target_column]
+    casos = [caso("informacion_mutua_vectorizada", lambda: informacion_mutua_vectorizada(X, y), len(X))]
+    if ctx["muestras"]:
+        muestra = X.iloc[:ctx["filas_muestra"]]
+        y_muestra = y.iloc[:ctx["filas_muestra"]].tolist()
+        casos.append(caso("calculate_mutual_information (muestra)",
+                          lambda: [calculate_mutual_information(muestra[col].tolist(), y_muestra)
+                                   for col in feature_columns],
+                          len(muestra)))
+    return casos
+
+
+def etapa_genetico(ctx):
+    # El coste no depende de las filas: la escala multiplica la población
+    info_mutua = ctx["info_mutua"]
+    poblacion = 100 * ctx["escala"]
+    generaciones = ctx["generaciones"]
+    individuos = poblacion * generaciones
+    casos = [caso(f"vectorizado (población {poblacion})",
+                  lambda: algoritmo_genetico_vectorizado(info_mutua, population_size=poblacion,
+                                                         num_generations=generaciones, seed=0, verbose=False,
+                                                         exhaustivo_hasta=0, memoizar=False),
+                  individuos, 'individuos')]
+    if ctx["muestras"]:
+        casos.append(caso("original (población 100)",
+                          lambda: algoritmo_genetico(info_mutua, population_size=100, num_generations=generaciones,
+                                                     verbose=False),
+                          100 * generaciones, 'individuos'))
+    return casos
+
+
+ETAPAS = {
+    "carga": etapa_carga,
+    "cluster": etapa_cluster,
+    "prism": etapa_prism,
+    "apply_rules": etapa_apply_rules,
+    "inferencia": etapa_inferencia,
+    "informacion_mutua": etapa_informacion_mutua,
+    "genetico": etapa_genetico,
+}
+
+
+def medir(ejecutar, repeticiones, memoria):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        ejecutar()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    resultado = {"segundos": mejor}
+    if memoria:
+        gc.collect()
+        activa = instrumentacion.activa
+        instrumentacion.reiniciar()
+        instrumentacion.activar()
+        tracemalloc.start()
+        try:
+            ejecutar()
+            resultado["memoria_pico_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+            instrumentacion.activar(activa)
+        resultado["instrumentacion"] = instrumentacion.resumen()
+    return resultado
+
+
+def comparar(resultados, anterior):
+    clave = lambda r: (r["etapa"], r["variante"], r["escala"])
+    previos = {clave(r): r for r in anterior["resultados"]}
+    print(f"\nComparación con {anterior['git'].get('commit') or 'resultados anteriores'}:")
+    for r in resultados:
+        previo = previos.get(clave(r))
+        if previo:
+            print(f"  {r['etapa']:18s} {r['variante']:40s} x{r['escala']:<4d} "
+                  f"{previo['segundos']:9.4f} s -> {r['segundos']:9.4f} s  ({previo['segundos'] / r['segundos']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de todas las etapas a varias escalas")
+    parser.add_argument("--csv", default="weather_prediction_clusterizado.csv",
+                        help="CSV con las columnas crudas, las *_cat y Clima")
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--filas-muestra", type=int, default=2000,
+                        help="Filas para las variantes fila a fila")
+    parser.add_argument("--filas-prism", type=int, default=300,
+                        help="Filas para el PRISM original (tarda minutos con unos miles)")
+    parser.add_argument("--metodos-cluster", nargs="+", default=["kmeans", "exacto"])
+    parser.add_argument("--generaciones", type=int, default=100)
+    parser.add_argument("--procesos", type=int, default=1)
+    parser.add_argument("--sin-memoria", action="store_true",
+                        help="No medir el pico de memoria ni los contadores (una ejecución menos por caso)")
+    parser.add_argument("--salida", default=None,
+                        help="JSON de resultados (por defecto resultados_benchmarks/<commit>.json)")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    git = info_git()
+    salida = args.salida or os.path.join("resultados_benchmarks",
+                                         f"{(git['commit'] or 'sin_git')[:12]}"
+                                         f"{'-modificado' if git['cambios_sin_commit'] else ''}.json")
+    base = pd.read_csv(args.csv)
+    base.columns = base.columns.str.strip()
+    reglas = load_rules(args.reglas)
+    X = base[feature_columns]
+    contexto = {
+        "archivo_reglas": args.reglas,
+        "reglas": reglas,
+        "reglas_prism": reglas_desde_json(reglas),
+        "info_mutua": informacion_mutua_vectorizada(X, base[target_column]),
+        "filas_muestra": args.filas_muestra,
+        "filas_prism": args.filas_prism,
+        "metodos_cluster": args.metodos_cluster,
+        "generaciones": args.generaciones,
+        "procesos": args.procesos,
+    }
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as temporal:
+        contexto["temporal"] = temporal
+        for posicion, escala in enumerate(args.escalas):
+            contexto.update(escala=escala, df=escalar(base, escala), muestras=posicion == 0)
+            print(f"Escala x{escala}: {len(contexto['df'])} filas")
+            for etapa in args.etapas:
+                for c in ETAPAS[etapa](contexto):
+                    medida = medir(c["ejecutar"], args.repeticiones, not args.sin_memoria)
+                    registro = {"etapa": etapa, "variante": c["variante"], "escala": escala,
+                                "cantidad": c["cantidad"], "unidad": c["unidad"],
+                                "por_segundo": c["cantidad"] / medida["segundos"], **medida}
+                    resultados.append(registro)
+                    memoria = f"{registro['memoria_pico_mb']:9.1f} MB" if "memoria_pico_mb" in registro else ""
+                    print(f"  {etapa:18s} {c['variante']:40s} {registro['segundos']:9.4f} s "
+                          f"{registro['por_segundo']:14,.0f} {c['unidad']}/s {memoria}", flush=True)
+
+    informe = {
+        "git": git,
+        "fecha": datetime.datetime.now().isoformat(timespec='seconds'),
+        "entorno": {"python": sys.version.split()[0], "numpy": np.__version__, "pandas": pd.__version__,
+                    "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("salida", "comparar")},
+        "resultados": resultados,
+    }
+    os.makedirs(os.path.dirname(salida) or '.', exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=4)
+    print(f"Resultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            comparar(resultados, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from almacenColumnar import cargar_arrays, existe_columnar, guardar_columnar
+
+# Carga de los CSV con tipos compactos y caché columnar.
+#
+# El CSV se lee por bloques y solo con las columnas pedidas. Cada columna se
+# reduce al tipo más pequeño que la representa sin pérdida: enteros a
+# int8/int16/int32, reales a float32 solo si todos sus valores son exactos en
+# float32 (si no, float64) y texto a category. El resultado se guarda como un
+# .npy por columna (almacenColumnar.py) en .cache_datos/, y las siguientes
+# cargas devuelven vistas sobre esos archivos mapeados en memoria, sin volver
+# a analizar el CSV ni copiar los datos. La caché se invalida cuando cambia el
+# tamaño o la fecha de modificación del CSV.
+#
+# Uso:
+#     from cargaDatos import cargar_dataframe
+#     df = cargar_dataframe('weather_prediction_clusterizado.csv', ['humidity_cat', 'Clima'])
+
+DIRECTORIO_CACHE = '.cache_datos'
+ORIGEN = 'origen.json'
+
+
+def compactar_columna(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object:
+        return serie.astype('category')
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return serie
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return pd.to_numeric(serie, downcast='integer')
+    if pd.api.types.is_float_dtype(serie.dtype):
+        valores = serie.to_numpy()
+        reducida = valores.astype(np.float32)
+        if np.array_equal(reducida.astype(valores.dtype), valores, equal_nan=True):
+            return pd.Series(reducida, index=serie.index, name=serie.name)
+    return serie
+
+
+def _unir(partes):
+    # Concatena los bloques de una columna con un tipo común
+    if isinstance(partes[0].dtype, pd.CategoricalDtype):
+        from pandas.api.types import union_categoricals
+        return pd.Series(union_categoricals([p.astype('category') for p in partes]))
+    tipo = np.result_type(*[p.dtype for p in partes])
+    if np.issubdtype(tipo, np.floating) and any(np.issubdtype(p.dtype, np.integer) for p in partes):
+        tipo = np.float64  # enteros mezclados con nulos: sin pérdida de precisión
+    return pd.Series(np.concatenate([p.to_numpy(dtype=tipo) for p in partes]))
+
+
+def leer_csv_compacto(path, columnas=None, chunksize=100_000):
+    # La memoria máxima es un bloque con los tipos por defecto más las
+    # columnas ya compactadas
+    partes = {}
+    for bloque in pd.read_csv(path, usecols=columnas, chunksize=chunksize):
+        bloque.columns = bloque.columns.str.strip()
+        for nombre in bloque.columns:
+            partes.setdefault(nombre, []).append(compactar_columna(bloque[nombre]))
+    orden = list(partes) if columnas is None else [c.strip() for c in columnas]
+    return pd.DataFrame({nombre: compactar_columna(_unir(partes[nombre])) for nombre in orden})
+
+
+def ruta_cache(path, columnas=None, directorio=DIRECTORIO_CACHE):
+    estado = os.stat(path)
+    clave = json.dumps([os.path.abspath(path), estado.st_size, estado.st_mtime_ns,
+                        None if columnas is None else sorted(columnas)])
+    nombre = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(directorio, f"{nombre}-{hashlib.sha256(clave.encode('utf-8')).hexdigest()[:16]}")
+
+
+def _origen(path, columnas):
+    return {"origen": os.path.abspath(path), "columnas": None if columnas is None else sorted(columnas)}
+
+
+def _limpiar_cache(path, columnas, directorio=DIRECTORIO_CACHE):
+    # Borra las copias de versiones anteriores del mismo CSV
+    if not os.path.isdir(directorio):
+        return
+    origen = _origen(path, columnas)
+    for nombre in os.listdir(directorio):
+        archivo = os.path.join(directorio, nombre, ORIGEN)
+        if os.path.exists(archivo):
+            with open(archivo, 'r', encoding='utf-8') as f:
+                if json.load(f) == origen:
+                    shutil.rmtree(os.path.join(directorio, nombre), ignore_errors=True)
+
+
+def cargar_columnas(path, columnas=None, cache=True, chunksize=100_000):
+    # {columna: array} con vistas sobre los archivos de la caché (solo
+    # lectura); las columnas de texto son pd.Categorical
+    if not cache:
+        df = leer_csv_compacto(path, columnas, chunksize)
+        return {nombre: df[nombre].array if isinstance(df[nombre].dtype, pd.CategoricalDtype)
+                else df[nombre].to_numpy() for nombre in df.columns}
+    directorio = ruta_cache(path, columnas)
+    if not existe_columnar(directorio):
+        _limpiar_cache(path, columnas)
+        os.makedirs(os.path.dirname(directorio), exist_ok=True)
+        guardar_columnar(leer_csv_compacto(path, columnas, chunksize), directorio)
+        with open(os.path.join(directorio, ORIGEN), 'w', encoding='utf-8') as f:
+            json.dump(_origen(path, columnas), f, ensure_ascii=False)
+    return cargar_arrays(directorio, columnas)
+
+
+def cargar_dataframe(path, columnas=None, cache=True, chunksize=100_000):
+    # Con copy=False cada columna queda en su propio bloque y el DataFrame
+    # apunta a los mismos arrays mapeados en memoria
+    return pd.DataFrame(cargar_columnas(path, columnas, cache, chunksize), copy=False)
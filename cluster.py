@@ -1,14 +1,27 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+
+import instrumentacion
+from cargaDatos import cargar_dataframe
+
+# sklearn solo se importa al ajustar: assign() y cargar_modelos() se usan al
+# predecir y no necesitan pagar esa importación
 
 
-df = pd.read_csv('weather_prediction.csv') 
 columnas = ['cloud_cover', 'humidity', 'pressure', 'precipitation', 'sunshine', 'temp_mean']
 n_clusters = 4
+metodos = ('kmeans', 'exacto', 'minibatch')
 
 
 def clusterizar_columna(df, columna, n_clusters):
-   
+    from sklearn.cluster import KMeans
+
     datos = df[[columna]].values.reshape(-1, 1)
     kmeans = KMeans(n_clusters=n_clusters, random_state=42)
     kmeans.fit(datos)
@@ -16,9 +29,232 @@ def clusterizar_columna(df, columna, n_clusters):
     return df
 
 
-for columna in columnas:
-    df = clusterizar_columna(df, columna, n_clusters)
+# --- k-means exacto en una dimensión ---
+# Como cada columna es unidimensional, la partición óptima en k grupos está
+# formada por intervalos contiguos de los valores ordenados y se puede obtener
+# exactamente con programación dinámica (Wang y Song, Ckmeans.1d.dp). Se
+# trabaja sobre los valores distintos con su número de apariciones como peso,
+# así que el coste depende de cuántos valores distintos hay y no de las filas.
+# Las etiquetas quedan ordenadas: 0 es el grupo de valores más bajos.
+def _capa_dp(anterior, coste, m, u):
+    # actual[j] = min sobre m <= i <= j de anterior[i - 1] + coste(i, j). El
+    # inicio óptimo i no decrece con j, así que se resuelve por divide y
+    # vencerás (como Ckmeans.1d.dp): se calcula el óptimo del j central de
+    # cada tramo y sus mitades solo buscan a su izquierda o a su derecha. Los
+    # tramos de un mismo nivel se evalúan juntos con numpy, O(u) por nivel y
+    # O(u log u) en total.
+    actual = np.full(u, np.inf)
+    inicio = np.zeros(u, dtype=np.intp)
+    # Tramos pendientes: j en [lo, hi] con el inicio óptimo en [a, b]
+    lo = np.array([m]); hi = np.array([u - 1]); a = np.array([m]); b = np.array([u - 1])
+    while len(lo):
+        mid = (lo + hi) // 2
+        n = np.minimum(mid, b) - a + 1
+        comienzos = np.cumsum(n) - n
+        tramo = np.repeat(np.arange(len(mid)), n)
+        i = np.arange(n.sum()) - comienzos[tramo] + a[tramo]
+        candidatos = anterior[i - 1] + coste(i, mid[tramo])
+        minimos = np.minimum.reduceat(candidatos, comienzos)
+        # Primer mínimo de cada tramo, el mismo desempate que np.argmin
+        es_minimo = np.flatnonzero(candidatos == minimos[tramo])
+        primero = es_minimo[np.r_[True, tramo[es_minimo[1:]] != tramo[es_minimo[:-1]]]]
+        mejor = i[primero]
+        actual[mid] = minimos
+        inicio[mid] = mejor
+
+        izquierda = mid > lo
+        derecha = mid < hi
+        lo, hi, a, b = (np.concatenate([lo[izquierda], mid[derecha] + 1]),
+                        np.concatenate([mid[izquierda] - 1, hi[derecha]]),
+                        np.concatenate([a[izquierda], mejor[derecha]]),
+                        np.concatenate([mejor[izquierda], b[derecha]]))
+    return actual, inicio
+
+
+def kmeans_1d_exacto(valores, n_clusters):
+    valores = np.asarray(valores, dtype=np.float64)
+    x, inverse, pesos = np.unique(valores, return_inverse=True, return_counts=True)
+    u = len(x)
+    k = min(n_clusters, u)
+    pesos = pesos.astype(np.float64)
+
+    # Sumas acumuladas (con los valores centrados para reducir la cancelación)
+    # para obtener en O(1) la suma de cuadrados de cualquier intervalo [i, j]
+    xc = x - np.average(x, weights=pesos)
+    s0 = np.concatenate([[0.0], np.cumsum(pesos)])
+    s1 = np.concatenate([[0.0], np.cumsum(pesos * xc)])
+    s2 = np.concatenate([[0.0], np.cumsum(pesos * xc * xc)])
+
+    def coste(i, j):
+        # Suma de cuadrados del intervalo de valores i..j (i y j pueden ser arrays)
+        n = s0[j + 1] - s0[i]
+        suma = s1[j + 1] - s1[i]
+        return np.maximum(s2[j + 1] - s2[i] - suma * suma / n, 0.0)
+
+    anterior = coste(np.zeros(u, dtype=np.intp), np.arange(u))
+    inicios = np.zeros((k, u), dtype=np.intp)  # inicio del último grupo de la solución (m, j)
+    for m in range(1, k):
+        anterior, inicios[m] = _capa_dp(anterior, coste, m, u)
+
+    # Reconstruir los límites de los grupos desde el final
+    etiqueta_valor = np.empty(u, dtype=np.intp)
+    fin = u - 1
+    for m in range(k - 1, -1, -1):
+        inicio = inicios[m, fin] if m > 0 else 0
+        etiqueta_valor[inicio:fin + 1] = m
+        fin = inicio - 1
+    centroides = np.bincount(etiqueta_valor, weights=pesos * x, minlength=k) / np.bincount(
+        etiqueta_valor, weights=pesos, minlength=k)
+    return etiqueta_valor[inverse.reshape(-1)], centroides
+
+
+@instrumentacion.cronometrado("cluster.ajuste_columna")
+def ajustar_columna(valores, n_clusters, metodo='kmeans'):
+    # Devuelve las etiquetas y los centroides (en el orden de las etiquetas)
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    datos = np.asarray(valores).reshape(-1, 1)
+    if metodo == 'kmeans':
+        modelo = KMeans(n_clusters=n_clusters, random_state=42).fit(datos)
+    elif metodo == 'minibatch':
+        modelo = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3).fit(datos)
+    elif metodo == 'exacto':
+        return kmeans_1d_exacto(datos.ravel(), n_clusters)
+    else:
+        raise ValueError(f"Método desconocido: {metodo!r} (opciones: {', '.join(metodos)})")
+    return modelo.labels_, modelo.cluster_centers_.ravel()
+
+
+def etiquetas_columna(valores, n_clusters, metodo='kmeans'):
+    return ajustar_columna(valores, n_clusters, metodo)[0]
+
+
+@instrumentacion.cronometrado("cluster.clusterizar")
+def clusterizar(df, columnas, n_clusters, metodo='kmeans', procesos=1):
+    # Las columnas son independientes, así que con procesos > 1 cada una se
+    # ajusta en un proceso distinto. Devuelve el DataFrame con las columnas
+    # *_cat y los modelos (centroides) de cada columna.
+    valores = [df[columna].to_numpy() for columna in columnas]
+    if procesos > 1 and len(columnas) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(columnas))) as executor:
+            ajustes = list(executor.map(ajustar_columna, valores, [n_clusters] * len(columnas),
+                                        [metodo] * len(columnas)))
+    else:
+        ajustes = [ajustar_columna(v, n_clusters, metodo) for v in valores]
+    for columna, (labels, _) in zip(columnas, ajustes):
+        df[columna + '_cat'] = labels
+    modelos = {columna: centroides for columna, (_, centroides) in zip(columnas, ajustes)}
+    return df, modelos
+
+
+# --- Modelos persistidos y asignación de nuevas observaciones ---
+# Los centroides de cada columna se guardan en un JSON pequeño en el orden de
+# sus etiquetas (las que aparecen en *_cat y con las que se aprendieron las
+# reglas PRISM), junto con el orden ascendente de los centroides. En una
+# dimensión el centroide más cercano se obtiene con un searchsorted sobre los
+# puntos medios entre centroides consecutivos, sin volver a clusterizar.
+def guardar_modelos(modelos, filename, metodo='kmeans'):
+    contenido = {"metodo": metodo, "columnas": {}}
+    for columna, centroides in modelos.items():
+        centroides = np.asarray(centroides, dtype=np.float64)
+        orden = np.argsort(centroides, kind='stable')
+        contenido["columnas"][columna] = {
+            "centroides": centroides.tolist(),          # índice = etiqueta
+            "centroides_ordenados": centroides[orden].tolist(),
+            "etiquetas": orden.tolist(),                # etiqueta de cada centroide ordenado
+        }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(contenido, f, ensure_ascii=False, indent=4)
+
+
+def cargar_modelos(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        contenido = json.load(f)
+    modelos = {}
+    for columna, modelo in contenido["columnas"].items():
+        ordenados = np.array(modelo["centroides_ordenados"])
+        modelos[columna] = {
+            "puntos_medios": (ordenados[1:] + ordenados[:-1]) / 2,
+            "etiquetas": np.array(modelo["etiquetas"], dtype=np.int8),
+        }
+    return modelos
+
+
+@instrumentacion.cronometrado("cluster.assign")
+def assign(datos, modelos):
+    # Categoría *_cat de cada lectura (DataFrame o mapeo columna -> array)
+    # según los centroides guardados. Los valores nulos reciben -1; un valor
+    # exactamente en el punto medio va al centroide menor.
+    categorias = {}
+    for columna, modelo in modelos.items():
+        x = np.asarray(datos[columna], dtype=np.float64)
+        codigos = modelo["etiquetas"][np.searchsorted(modelo["puntos_medios"], x, side='left')]
+        codigos[np.isnan(x)] = -1
+        categorias[columna + '_cat'] = codigos
+    return categorias
+
+
+# --- Modo por bloques (datasets que no caben en memoria) ---
+# Primera pasada: MiniBatchKMeans.partial_fit de cada columna con cada bloque.
+# Segunda pasada: se asignan las etiquetas bloque a bloque y se escriben.
+def clusterizar_csv_por_bloques(entrada, salida, columnas, n_clusters, chunksize=100_000):
+    from sklearn.cluster import MiniBatchKMeans
+
+    modelos = {columna: MiniBatchKMeans(n_clusters=n_clusters, random_state=42) for columna in columnas}
+    for bloque in pd.read_csv(entrada, chunksize=chunksize):
+        for columna, modelo in modelos.items():
+            modelo.partial_fit(bloque[[columna]].values)
+
+    filas = 0
+    for numero, bloque in enumerate(pd.read_csv(entrada, chunksize=chunksize)):
+        for columna, modelo in modelos.items():
+            bloque[columna + '_cat'] = modelo.predict(bloque[[columna]].values)
+        bloque.to_csv(salida, mode='w' if numero == 0 else 'a', header=numero == 0, index=False)
+        filas += len(bloque)
+    return filas, {columna: modelo.cluster_centers_.ravel() for columna, modelo in modelos.items()}
+
+
+def coincidencia_etiquetas(a, b):
+    # Fracción de filas con la misma etiqueta tras el mejor reetiquetado de b
+    # (asignación húngara sobre la tabla de contingencia)
+    from scipy.optimize import linear_sum_assignment
+
+    codes_a, _ = pd.factorize(np.asarray(a))
+    codes_b, _ = pd.factorize(np.asarray(b))
+    tabla = np.zeros((codes_a.max() + 1, codes_b.max() + 1), dtype=np.int64)
+    np.add.at(tabla, (codes_a, codes_b), 1)
+    filas, cols = linear_sum_assignment(tabla, maximize=True)
+    return tabla[filas, cols].sum() / len(codes_a)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clusterización de las columnas de weather_prediction.csv")
+    parser.add_argument("--entrada", default='weather_prediction.csv')
+    parser.add_argument("--salida", default='weather_prediction_clusterizado.csv')
+    parser.add_argument("--metodo", choices=metodos, default='kmeans',
+                        help="kmeans (sklearn), exacto (k-means 1-D óptimo) o minibatch")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos para ajustar las columnas en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Procesar el CSV por bloques con MiniBatchKMeans.partial_fit")
+    parser.add_argument("--modelos", default='modelos_cluster.json',
+                        help="Archivo donde guardar los centroides de cada columna")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    if args.chunksize:
+        _, modelos = clusterizar_csv_por_bloques(args.entrada, args.salida, columnas, n_clusters, args.chunksize)
+        metodo = 'minibatch'
+    else:
+        df = cargar_dataframe(args.entrada)
+        df, modelos = clusterizar(df, columnas, n_clusters, args.metodo, args.procesos or os.cpu_count())
+        df.to_csv(args.salida, index=False)
+        metodo = args.metodo
+    guardar_modelos(modelos, args.modelos, metodo)
+
+    print(f"El archivo '{args.salida}' ha sido generado con éxito "
+          f"({time.perf_counter() - inicio:.2f} s).")
 
-df.to_csv('weather_prediction_clusterizado.csv', index=False)
 
-print("El archivo 'weather_prediction_clusterizado.csv' ha sido generado con éxito.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from logicaDifusa import aggregate_results, clima_values, compile_rules, infer_consequent
+from prism import apply_rules_vectorizado, guardar_reglas_json, reglas_a_json, reglas_desde_json
+from reglasBinarias import guardar_reglas_binario
+from tablaInferencia import ATRIBUTOS
+
+# Compactación de las reglas PRISM. Pasos, en este orden:
+#
+#   muertas:      reglas que no cumple ninguna combinación del dominio.
+#   fusionadas:   reglas de la misma clase que solo se diferencian en el valor
+#                 de un atributo y que entre todas cubren todos sus valores se
+#                 sustituyen por una sola regla sin esa condición.
+#   subsumidas:   reglas con una regla más general (sus condiciones son un
+#                 subconjunto) de la misma clase.
+#   inalcanzables: reglas que nunca son la primera en cumplirse.
+#
+# Cada cambio se acepta solo si no altera, en ninguna combinación del dominio,
+# ni la predicción de apply_rules (primera regla que se cumple) ni la de
+# aggregate_results (clase más votada entre todas las reglas que se cumplen)
+# ni, salvo con --solo-clase, el valor de defuzzify_results.
+# El dominio son las combinaciones de categorías que aparecen en los datos de
+# entrenamiento o, con --dominio completo, además todas las combinaciones
+# posibles de sus valores (las que puede producir la fuzzificación). Las
+# predicciones se calculan sobre la matriz de coincidencias combinación x
+# regla, y solo para las combinaciones afectadas por cada cambio.
+#
+# Uso:
+#     python compactacionReglas.py --reglas prism_rules.json --salida prism_rules_compactas.json
+
+
+def _combinaciones(df, atributos, dominio='entrenamiento'):
+    combinaciones = df[atributos].drop_duplicates().to_numpy(dtype=np.int64)
+    if dominio == 'completo':
+        valores = [np.unique(combinaciones[:, a]) for a in range(len(atributos))]
+        completas = np.array(list(itertools.product(*valores)), dtype=np.int64)
+        combinaciones = np.unique(np.concatenate([combinaciones, completas]), axis=0)
+    return combinaciones
+
+
+def _columna(rule_conditions, combinaciones, posicion):
+    match = np.ones(len(combinaciones), dtype=bool)
+    for attr, val in rule_conditions:
+        match &= combinaciones[:, posicion[attr]] == val
+    return match
+
+
+def _predicciones(matches, clase_ids, n_clases, valores_clase):
+    # Para cada combinación: clase de la primera regla que se cumple (apply_rules),
+    # clase más votada (aggregate_results: a igualdad de votos gana la clase que
+    # aparece antes) y valor crisp (defuzzify_results). -1 / NaN si ninguna.
+    n_reglas = matches.shape[1]
+    hay = matches.any(axis=1)
+    primera = np.full(len(matches), -1, dtype=np.intp)
+    if n_reglas:
+        primera[hay] = clase_ids[matches[hay].argmax(axis=1)]
+
+    conteos = np.zeros((len(matches), n_clases), dtype=np.int64)
+    primera_posicion = np.full((len(matches), n_clases), n_reglas, dtype=np.int64)
+    posiciones = np.where(matches, np.arange(n_reglas), n_reglas)
+    for k in range(n_clases):
+        columnas = clase_ids == k
+        if columnas.any():
+            conteos[:, k] = matches[:, columnas].sum(axis=1)
+            primera_posicion[:, k] = posiciones[:, columnas].min(axis=1)
+    agregada = np.argmax(conteos * (n_reglas + 1) - primera_posicion, axis=1)
+    agregada[~hay] = -1
+    with np.errstate(invalid='ignore'):
+        crisp = conteos @ valores_clase / conteos.sum(axis=1)
+    return primera, agregada, crisp
+
+
+def compactar(rules, df, atributos=ATRIBUTOS, dominio='entrenamiento', conservar_crisp=True):
+    combinaciones = _combinaciones(df, atributos, dominio)
+    posicion = {attr: index for index, attr in enumerate(atributos)}
+    valores_dominio = {attr: set(np.unique(combinaciones[:, posicion[attr]]).tolist()) for attr in atributos}
+
+    clases = list(dict.fromkeys(target_class for _, target_class in rules))
+    valores_clase = np.array([clima_values.get(clase, np.nan) for clase in clases], dtype=np.float64)
+    indice_clase = {clase: index for index, clase in enumerate(clases)}
+
+    reglas = [(list(rule_conditions), target_class) for rule_conditions, target_class in rules]
+    clase_ids = np.array([indice_clase[c] for _, c in reglas], dtype=np.intp)
+    matches = np.column_stack([_columna(c, combinaciones, posicion) for c, _ in reglas]) if reglas else \
+        np.zeros((len(combinaciones), 0), dtype=bool)
+    referencia = _predicciones(matches, clase_ids, len(clases), valores_clase)
+    informe = {"muertas": 0, "fusionadas": 0, "subsumidas": 0, "inalcanzables": 0}
+
+    def sin_cambios(filas, matches_filas, clase_ids_nuevos):
+        nuevas = _predicciones(matches_filas, clase_ids_nuevos, len(clases), valores_clase)
+        iguales = np.array_equal(nuevas[0], referencia[0][filas]) and np.array_equal(nuevas[1], referencia[1][filas])
+        if iguales and conservar_crisp:
+            iguales = np.allclose(nuevas[2], referencia[2][filas], rtol=0, atol=1e-12, equal_nan=True)
+        return iguales
+
+    def probar_eliminar(r):
+        nonlocal matches, clase_ids
+        filas = np.flatnonzero(matches[:, r])
+        if not sin_cambios(filas, np.delete(matches[filas], r, axis=1), np.delete(clase_ids, r)):
+            return False
+        del reglas[r]
+        matches = np.delete(matches, r, axis=1)
+        clase_ids = np.delete(clase_ids, r)
+        return True
+
+    # Reglas muertas: eliminarlas no cambia nada en el dominio
+    vivas = matches.any(axis=0)
+    informe["muertas"] = int((~vivas).sum())
+    reglas = [regla for regla, viva in zip(reglas, vivas) if viva]
+    matches, clase_ids = matches[:, vivas], clase_ids[vivas]
+
+    # Fusión de hermanas que cubren todos los valores de un atributo. En cada
+    # pasada se prueban los grupos que no comparten reglas con una fusión ya
+    # aceptada en esa pasada; las reglas absorbidas se desactivan y se
+    # eliminan al final de la pasada.
+    cambio = True
+    while cambio:
+        cambio = False
+        grupos = {}
+        for index, (rule_conditions, target_class) in enumerate(reglas):
+            for attr, val in rule_conditions:
+                resto = frozenset((a, v) for a, v in rule_conditions if a != attr)
+                grupos.setdefault((target_class, attr, resto), []).append((index, val))
+        activas = np.ones(len(reglas), dtype=bool)
+        tocadas = set()
+        for (target_class, attr, resto), hermanas in grupos.items():
+            indices = sorted(index for index, _ in hermanas)
+            if ({val for _, val in hermanas} != valores_dominio[attr] or len(hermanas) != len(valores_dominio[attr])
+                    or tocadas.intersection(indices)):
+                continue
+            primera, otras = indices[0], indices[1:]
+            condiciones = [(a, v) for a, v in reglas[primera][0] if a != attr]
+            columna = _columna(condiciones, combinaciones, posicion)
+            filas = np.flatnonzero(columna)
+            matches_filas = matches[filas]
+            matches_filas[:, primera] = True
+            quedan = activas.copy()
+            quedan[otras] = False
+            if not sin_cambios(filas, matches_filas[:, quedan], clase_ids[quedan]):
+                continue
+            reglas[primera] = (condiciones, target_class)
+            matches[:, primera] = columna
+            activas = quedan
+            tocadas.update(indices)
+            informe["fusionadas"] += len(otras)
+            cambio = True
+        reglas = [regla for regla, activa in zip(reglas, activas) if activa]
+        matches, clase_ids = matches[:, activas], clase_ids[activas]
+
+    # Reglas subsumidas por otra más general de la misma clase
+    r = len(reglas) - 1
+    while r >= 0:
+        condiciones, target_class = reglas[r]
+        condiciones = set(condiciones)
+        general = any(g != r and reglas[g][1] == target_class and set(reglas[g][0]) <= condiciones
+                      and (len(reglas[g][0]) < len(condiciones) or g < r) for g in range(len(reglas)))
+        if general and probar_eliminar(r):
+            informe["subsumidas"] += 1
+        r -= 1
+
+    # Reglas que nunca son la primera en cumplirse
+    r = len(reglas) - 1
+    while r >= 0:
+        propias = matches[:, r]
+        if not (propias & ~matches[:, :r].any(axis=1)).any() and probar_eliminar(r):
+            informe["inalcanzables"] += 1
+        r -= 1
+
+    return reglas, informe
+
+
+def tiempo_emparejamiento(rules_json, combinaciones, atributos, repeticiones=3):
+    # Segundos de infer_consequent (recorrido de la lista) y del índice
+    # compilado sobre las combinaciones, junto con las clases agregadas
+    entradas = [dict(zip(atributos, fila)) for fila in combinaciones.tolist()]
+    compiladas = compile_rules(rules_json)
+    tiempos = {}
+    for nombre, reglas in (("lista", rules_json), ("compiladas", compiladas)):
+        mejor = float('inf')
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultados = [infer_consequent(entrada, reglas) for entrada in entradas]
+            mejor = min(mejor, time.perf_counter() - inicio)
+        tiempos[nombre] = mejor
+    clases = [aggregate_results(r)[0] if r else None for r in resultados]
+    return tiempos, clases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compactar las reglas PRISM sin cambiar sus predicciones")
+    parser.add_argument("--reglas", default='prism_rules.json')
+    parser.add_argument("--datos", default='weather_prediction_clusterizado.csv',
+                        help="Datos de entrenamiento clusterizados (CSV o directorio columnar)")
+    parser.add_argument("--salida", default='prism_rules_compactas.json')
+    parser.add_argument("--dominio", choices=('entrenamiento', 'completo'), default='entrenamiento',
+                        help="Combinaciones en las que se exige que las predicciones no cambien")
+    parser.add_argument("--solo-clase", action='store_true',
+                        help="Exigir solo la misma clase, no el mismo valor defuzzificado")
+    args = parser.parse_args(argv)
+
+    with open(args.reglas, 'r', encoding='utf-8') as f:
+        rules_json = json.load(f)
+    rules = reglas_desde_json(rules_json)
+    if os.path.isdir(args.datos):
+        from almacenColumnar import cargar_columnar
+        df = cargar_columnar(args.datos, ATRIBUTOS)
+    else:
+        from cargaDatos import cargar_dataframe
+        df = cargar_dataframe(args.datos, ATRIBUTOS)
+
+    inicio = time.perf_counter()
+    compactas, informe = compactar(rules, df, ATRIBUTOS, args.dominio, not args.solo_clase)
+    segundos = time.perf_counter() - inicio
+    compactas_json = reglas_a_json(compactas)
+
+    # Comprobación final con las funciones originales sobre los datos
+    if apply_rules_vectorizado(rules, df) != apply_rules_vectorizado(compactas, df):
+        raise AssertionError("apply_rules cambia con las reglas compactadas")
+    combinaciones = _combinaciones(df, ATRIBUTOS, args.dominio)
+    tiempos_antes, agregadas_antes = tiempo_emparejamiento(rules_json, combinaciones, ATRIBUTOS)
+    tiempos_despues, agregadas_despues = tiempo_emparejamiento(compactas_json, combinaciones, ATRIBUTOS)
+    if agregadas_antes != agregadas_despues:
+        raise AssertionError("aggregate_results cambia con las reglas compactadas")
+
+    guardar_reglas_json(compactas, args.salida)
+    guardar_reglas_binario(compactas_json, os.path.splitext(args.salida)[0] + '.bin')
+
+    print(f"Reglas: {len(rules)} -> {len(compactas)} "
+          f"({100 * (1 - len(compactas) / len(rules)):.1f} % menos) en {segundos:.2f} s")
+    for nombre, cantidad in informe.items():
+        print(f"  {nombre}: {cantidad}")
+    for nombre in tiempos_antes:
+        print(f"Emparejamiento ({nombre}) sobre {len(combinaciones)} combinaciones: "
+              f"{tiempos_antes[nombre] * 1000:.1f} ms -> {tiempos_despues[nombre] * 1000:.1f} ms "
+              f"({tiempos_antes[nombre] / tiempos_despues[nombre]:.2f}x)")
+    print(f"Predicciones de apply_rules y aggregate_results sin cambios. Reglas guardadas en '{args.salida}'.")
+
+
+if __name__ == "__main__":
+    main()
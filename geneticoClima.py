@@ -1,33 +1,43 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 
 import pandas as pd
 import numpy as np
 from collections import Counter
 from math import log2
 
-# Cargar el dataset
-file_path = '../weather-prediction-with-climate-extended.csv'  # Cambia la ruta según tu archivo
-data = pd.read_csv(file_path, delimiter=',')
-data.columns = data.columns.str.strip()
-data = data.drop(columns=['DATE', 'MONTH'], errors='ignore')
+import instrumentacion
+from cargaDatos import cargar_columnas
 
 # Definir características y la clase objetivo
-feature_columns = ['cloud_cover', 'humidity', 'pressure', 
-                   'global_radiation', 'precipitation', 'sunshine', 
+feature_columns = ['cloud_cover', 'humidity', 'pressure',
+                   'global_radiation', 'precipitation', 'sunshine',
                    'temp_mean', 'temp_min', 'temp_max']
 target_column = 'Clima'  # Columna de clase
 
-X = data[feature_columns]
-y = data[target_column]
-
 # Parámetros del algoritmo genético
 population_size = 100
 num_generations = 1000
 mutation_rate = 0.3  # Tasa de mutación inicial
+final_mutation_rate = 0.1  # Tasa de mutación a partir de la mitad de las generaciones
 crossover_rate = 0.6  # Tasa de cruce
 num_features = len(feature_columns)
-population = np.random.randint(2, size=(population_size, num_features))
+
+# Cargar el dataset
+def cargar_datos(file_path):
+    # Solo las columnas necesarias, con tipos compactos y sin copiar los
+    # arrays de la caché columnar (ver cargaDatos.py)
+    data = cargar_columnas(file_path, feature_columns + [target_column])
+    X = pd.DataFrame({col: data[col] for col in feature_columns}, copy=False)
+    return X, pd.Series(data[target_column], name=target_column)
 
 # Función para calcular la información mutua manualmente
+@instrumentacion.cronometrado("informacion_mutua.counter")
 def calculate_mutual_information(feature, target):
     # Obtener la frecuencia conjunta de (feature, target)
     joint_counts = Counter(zip(feature, target))
@@ -50,11 +60,157 @@ def calculate_mutual_information(feature, target):
             mutual_info += p_xy * log2(p_xy / (p_x * p_y))
     return mutual_info
 
-# Calcular la información mutua para cada característica respecto a Clima
-info_mutua = [calculate_mutual_information(X[col], y) for col in feature_columns]
+# Información mutua vectorizada. Cada columna se factoriza a códigos enteros
+# y la tabla conjunta (valor x clase) se obtiene con un único np.bincount sobre
+# el código combinado codigo_valor * n_clases + codigo_clase, en lugar de un
+# Counter sobre pares de Python.
+def _codigos(valores, bins=None):
+    if bins is None:
+        codes, uniques = pd.factorize(valores, use_na_sentinel=False)
+        return codes, len(uniques)
+    # Discretización opcional de variables continuas (bins como en
+    # np.histogram_bin_edges: un número de intervalos o una regla como 'auto')
+    valores = np.asarray(valores, dtype=np.float64)
+    edges = np.histogram_bin_edges(valores[~np.isnan(valores)], bins=bins)
+    codes = np.clip(np.searchsorted(edges, valores, side='right') - 1, 0, len(edges) - 2)
+    codes[np.isnan(valores)] = len(edges) - 1  # los nulos forman su propio intervalo
+    return codes, len(edges)
+
+def _informacion_mutua_codigos(codes_x, n_x, codes_y, n_y):
+    joint_counts = np.bincount(codes_x * n_y + codes_y, minlength=n_x * n_y).reshape(n_x, n_y)
+    total_samples = len(codes_x)
+    p_xy = joint_counts / total_samples
+    p_x = joint_counts.sum(axis=1) / total_samples
+    p_y = joint_counts.sum(axis=0) / total_samples
+    nonzero = joint_counts > 0
+    return float(np.sum(p_xy[nonzero] * np.log2(p_xy[nonzero] / np.outer(p_x, p_y)[nonzero])))
+
+def _informacion_mutua_columna(valores, bins, codes_y, n_y):
+    codes_x, n_x = _codigos(valores, bins)
+    return _informacion_mutua_codigos(codes_x, n_x, codes_y, n_y)
+
+@instrumentacion.cronometrado("informacion_mutua.vectorizada")
+def informacion_mutua_vectorizada(X, y, bins=None, procesos=1):
+    # Información mutua de cada columna de X con y, en el orden de las
+    # columnas. `bins` puede ser un valor común o un diccionario por columna.
+    codes_y, n_y = _codigos(y)
+    columnas = list(X.columns)
+    bins_columna = [bins.get(col) if isinstance(bins, dict) else bins for col in columnas]
+    valores = [X[col].to_numpy() for col in columnas]
+    if procesos > 1 and len(columnas) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(columnas))) as executor:
+            resultado = list(executor.map(_informacion_mutua_columna, valores, bins_columna,
+                                          [codes_y] * len(columnas), [n_y] * len(columnas)))
+    else:
+        resultado = [_informacion_mutua_columna(v, b, codes_y, n_y) for v, b in zip(valores, bins_columna)]
+    return np.array(resultado)
+
+# --- Fitness envolvente (wrapper) ---
+# En lugar de sumar la información mutua de cada característica (que no tiene
+# en cuenta la redundancia entre temp_mean, temp_min y temp_max), se puntúa cada
+# subconjunto con la precisión media en validación cruzada de un clasificador
+# entrenado solo con esas columnas. Es mucho más caro, así que los subconjuntos
+# nuevos se evalúan en paralelo en un grupo de procesos y los resultados se
+# guardan en una caché en disco (JSON) que se reutiliza entre ejecuciones.
+
+modelos_envolvente = ('arbol', 'bayes')
+
+def _crear_modelo(modelo, seed):
+    if modelo == 'arbol':
+        from sklearn.tree import DecisionTreeClassifier
+        return DecisionTreeClassifier(max_depth=8, random_state=seed)
+    if modelo == 'bayes':
+        from sklearn.naive_bayes import GaussianNB
+        return GaussianNB()
+    raise ValueError(f"Modelo desconocido: {modelo!r} (opciones: {', '.join(modelos_envolvente)})")
+
+# Datos de cada proceso trabajador (se envían una sola vez al arrancar)
+_datos_envolvente = None
+
+def _iniciar_trabajador_envolvente(X, y, modelo, cv, seed):
+    global _datos_envolvente
+    _datos_envolvente = (X, y, modelo, cv, seed)
+
+def _precision_subconjunto(individual):
+    from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+    X, y, modelo, cv, seed = _datos_envolvente
+    columnas = np.flatnonzero(individual)
+    if len(columnas) == 0:
+        return 0.0  # Penalizar individuos que no seleccionen ninguna característica
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=seed)
+    with warnings.catch_warnings():
+        # Algunas clases (Lluvia Intensa) tienen menos filas que folds
+        warnings.filterwarnings('ignore', message='The least populated class', category=UserWarning)
+        return float(cross_val_score(_crear_modelo(modelo, seed), X[:, columnas], y, cv=folds).mean())
+
+class FitnessEnvolvente:
+    def __init__(self, X, y, modelo='arbol', cv=5, procesos=1, cache_path='fitness_envolvente.json', seed=0):
+        self.X = np.asarray(X, dtype=np.float64)
+        self.y = pd.factorize(np.asarray(y))[0]
+        self.datos = (self.X, self.y, modelo, cv, seed)
+        self.procesos = procesos
+        self.cache_path = cache_path
+        self.evaluaciones = 0
+        self._executor = None
+
+        # La caché distingue los resultados por datos y parámetros: cambiar el
+        # dataset, el modelo o los folds no reutiliza precisiones antiguas
+        h = hashlib.sha256()
+        h.update(self.X.tobytes())
+        h.update(self.y.tobytes())
+        h.update(json.dumps([modelo, cv, seed]).encode())
+        self.contexto = h.hexdigest()
+        self._todo = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self._todo = json.load(f)
+        self.cache = self._todo.setdefault(self.contexto, {})
+
+    def _evaluar(self, individuos):
+        if self.procesos > 1 and len(individuos) > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.procesos,
+                                                     initializer=_iniciar_trabajador_envolvente,
+                                                     initargs=self.datos)
+            return list(self._executor.map(_precision_subconjunto, individuos))
+        _iniciar_trabajador_envolvente(*self.datos)
+        return [_precision_subconjunto(individual) for individual in individuos]
+
+    def __call__(self, population):
+        claves = [''.join(map(str, individual)) for individual in population.astype(np.uint8).tolist()]
+        faltan = list(dict.fromkeys(clave for clave in claves if clave not in self.cache))
+        if faltan:
+            individuos = [np.array([int(bit) for bit in clave], dtype=np.uint8) for clave in faltan]
+            for clave, precision in zip(faltan, self._evaluar(individuos)):
+                self.cache[clave] = precision
+            self.evaluaciones += len(faltan)
+            self.guardar()
+        return np.array([self.cache[clave] for clave in claves])
+
+    def guardar(self):
+        if not self.cache_path:
+            return
+        temporal = self.cache_path + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._todo, f)
+        os.replace(temporal, self.cache_path)
+
+    def cerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+# --- Algoritmo genético original (un individuo cada vez) ---
 
 # Función de fitness basada en la suma de la información mutua con Clima
-def evaluate(individual):
+def evaluate(individual, info_mutua):
     selected_features = [index for index, bit in enumerate(individual) if bit == 1]
 
     if len(selected_features) == 0:
@@ -65,10 +221,10 @@ def evaluate(individual):
 
     return fitness_score  # El fitness es la suma de la información mutua
 
-# Función de selección por ruleta 
+# Función de selección por ruleta
 def roulette_selection(population, fitness_scores):
     total_fitness = np.sum(fitness_scores)
-    if total_fitness == 0:  
+    if total_fitness == 0:
         selected_index = np.random.randint(len(population))
     else:
         normalized_fitness = fitness_scores / total_fitness
@@ -92,47 +248,279 @@ def mutate(individual, mutation_rate):
             individual[i] = 1 - individual[i]
     return individual
 
-# Ejecución del algoritmo genético
-best_overall_fitness = 0
-best_overall_features = []
+@instrumentacion.cronometrado("genetico.original")
+def algoritmo_genetico(info_mutua, population_size=population_size, num_generations=num_generations,
+                       mutation_rate=mutation_rate, verbose=True):
+    population = np.random.randint(2, size=(population_size, num_features))
+
+    # Ejecución del algoritmo genético
+    best_overall_fitness = 0
+    best_overall_features = []
+
+    for generation in range(num_generations):
+        # Reducir la tasa de mutación a la mitad de las generaciones
+        if generation > num_generations // 2:
+            mutation_rate = final_mutation_rate
+
+        # Calcular el fitness de cada individuo en la población
+        fitness_scores = np.array([evaluate(ind, info_mutua) for ind in population])
+        if instrumentacion.activa:
+            instrumentacion.contar("genetico.generaciones")
+            instrumentacion.contar("genetico.individuos_evaluados", len(population))
+
+        # Selección de la siguiente generación
+        new_population = []
+        while len(new_population) < population_size:
+            parent1 = roulette_selection(population, fitness_scores)
+            parent2 = roulette_selection(population, fitness_scores)
 
-for generation in range(num_generations):
-    # Reducir la tasa de mutación a la mitad de las generaciones
-    if generation > num_generations // 2:
-        mutation_rate = 0.1
+            # Cruce y mutación
+            child1, child2 = crossover(parent1, parent2)
+            child1 = mutate(child1, mutation_rate)
+            child2 = mutate(child2, mutation_rate)
 
-    # Calcular el fitness de cada individuo en la población
-    fitness_scores = np.array([evaluate(ind) for ind in population])
+            new_population.extend([child1, child2])
 
-    # Selección de la siguiente generación
-    new_population = []
-    while len(new_population) < population_size:
-        parent1 = roulette_selection(population, fitness_scores)
-        parent2 = roulette_selection(population, fitness_scores)
+        # Actualizar la población
+        population = np.array(new_population[:population_size])
 
-        # Cruce y mutación
-        child1, child2 = crossover(parent1, parent2)
-        child1 = mutate(child1, mutation_rate)
-        child2 = mutate(child2, mutation_rate)
+        # Mejor individuo de la generación actual
+        best_fitness = np.max(fitness_scores)
+        best_individual = population[np.argmax(fitness_scores)]
+        selected_features = [feature_columns[i] for i in range(num_features) if best_individual[i] == 1]
 
-        new_population.extend([child1, child2])
+        # Actualizar el mejor individuo global
+        if best_fitness > best_overall_fitness:
+            best_overall_fitness = best_fitness
+            best_overall_features = selected_features
 
-    # Actualizar la población
-    population = np.array(new_population[:population_size])
+        if verbose:
+            print(f"Generación {generation + 1}")
+            print(f"Mejor fitness de la generación: {best_fitness:.2f}")
+            print(f"Características seleccionadas: {selected_features}")
 
-    # Mejor individuo de la generación actual
-    best_fitness = np.max(fitness_scores)
-    best_individual = population[np.argmax(fitness_scores)]
-    selected_features = [feature_columns[i] for i in range(num_features) if best_individual[i] == 1]
+    return best_overall_features, best_overall_fitness
+
+# --- Algoritmo genético vectorizado (toda la población a la vez) ---
+# La población es una matriz de bits (individuos x características). En cada
+# generación el fitness es un único producto matriz-vector con info_mutua y la
+# selección por ruleta, el cruce de un punto y la mutación se aplican a toda la
+# matriz con operaciones de NumPy, usando un np.random.Generator con semilla
+# para que las ejecuciones sean reproducibles.
+
+def seleccion_ruleta(fitness_scores, n, rng):
+    # Índices de n padres elegidos con probabilidad proporcional al fitness
+    total_fitness = fitness_scores.sum()
+    if total_fitness == 0:
+        return rng.integers(len(fitness_scores), size=n)
+    acumulado = np.cumsum(fitness_scores / total_fitness)
+    indices = np.searchsorted(acumulado, rng.random(n), side='right')
+    return np.minimum(indices, len(fitness_scores) - 1)
+
+def cruce_poblacion(padres1, padres2, crossover_rate, rng):
+    # Cruce de un punto para cada pareja; el punto se elige en [1, n - 2] como
+    # en crossover()
+    n_parejas, n_features = padres1.shape
+    if n_features < 3:
+        return padres1.copy(), padres2.copy()
+    cruzar = rng.random(n_parejas) < crossover_rate
+    puntos = rng.integers(1, n_features - 1, size=n_parejas)
+    del_otro = (np.arange(n_features) >= puntos[:, None]) & cruzar[:, None]
+    return np.where(del_otro, padres2, padres1), np.where(del_otro, padres1, padres2)
+
+def mutacion_poblacion(population, mutation_rate, rng):
+    return population ^ (rng.random(population.shape) < mutation_rate)
+
+# Caché de fitness por subconjunto de características. La clave es la fila de
+# bits empaquetada (np.packbits), así que cada subconjunto se evalúa una sola
+# vez aunque aparezca en muchas generaciones o varias veces en la misma.
+class FitnessMemoizado:
+    def __init__(self, fitness):
+        self.fitness = fitness
+        self.cache = {}
+        self.evaluaciones = 0
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __call__(self, population):
+        packed = np.packbits(population.astype(bool), axis=1)
+        unicos, primeros, inverse = np.unique(packed, axis=0, return_index=True, return_inverse=True)
+        claves = [fila.tobytes() for fila in unicos]
+        faltan = [i for i, clave in enumerate(claves) if clave not in self.cache]
+        if faltan:
+            nuevos = np.asarray(self.fitness(population[primeros[faltan]]), dtype=np.float64)
+            self.evaluaciones += len(faltan)
+            for i, valor in zip(faltan, nuevos.tolist()):
+                self.cache[claves[i]] = valor
+        return np.array([self.cache[clave] for clave in claves])[inverse.reshape(-1)]
+
+    def mejor(self, n_features):
+        # Mejor subconjunto evaluado hasta ahora (individuo, fitness)
+        clave, valor = max(self.cache.items(), key=lambda item: item[1])
+        bits = np.unpackbits(np.frombuffer(clave, dtype=np.uint8))[:n_features]
+        return bits, valor
+
+def todos_los_subconjuntos(n_features):
+    # Matriz (2^n x n) con todos los subconjuntos de características
+    codigos = np.arange(2 ** n_features)[:, None]
+    return ((codigos >> np.arange(n_features)) & 1).astype(np.uint8)
+
+def busqueda_exhaustiva(fitness, n_features, names=None):
+    names = feature_columns if names is None else names
+    population = todos_los_subconjuntos(n_features)
+    fitness_scores = np.asarray(fitness(population), dtype=np.float64)
+    best_index = int(np.argmax(fitness_scores))
+    return [names[i] for i in np.flatnonzero(population[best_index])], fitness_scores[best_index]
+
+@instrumentacion.cronometrado("genetico.vectorizado")
+def algoritmo_genetico_vectorizado(info_mutua, population_size=population_size,
+                                   num_generations=num_generations, mutation_rate=mutation_rate,
+                                   final_mutation_rate=final_mutation_rate,
+                                   crossover_rate=crossover_rate, seed=None, fitness=None,
+                                   verbose=True, names=None, paciencia=None, log_cada=1,
+                                   exhaustivo_hasta=4096, memoizar=None):
+    # `fitness` permite sustituir la suma de información mutua por cualquier
+    # función que reciba la matriz de población y devuelva un fitness por fila.
+    #
+    # La ejecución termina antes de num_generations cuando la respuesta ya se
+    # conoce:
+    #   - si hay como mucho `exhaustivo_hasta` subconjuntos posibles se
+    #     evalúan todos directamente, sin algoritmo genético;
+    #   - si la caché de fitness ya contiene todos los subconjuntos;
+    #   - si el mejor fitness no mejora durante `paciencia` generaciones.
+    #
+    # Con memoizar=None la caché se usa si el fitness es una función externa
+    # (presumiblemente cara) o si el espacio es lo bastante pequeño como para
+    # llegar a recorrerse entero; el producto con info_mutua sobre espacios
+    # enormes es más barato que consultar la caché.
+    info_mutua = np.asarray(info_mutua, dtype=np.float64)
+    if memoizar is None:
+        memoizar = fitness is not None or 2 ** len(info_mutua) <= 2 ** 20
+    if fitness is None:
+        fitness = lambda population: population @ info_mutua
+    names = feature_columns if names is None else names
+    n_features = len(info_mutua)
+    n_subconjuntos = 2 ** n_features
+
+    if n_subconjuntos <= exhaustivo_hasta:
+        if verbose:
+            print(f"Búsqueda exhaustiva de los {n_subconjuntos} subconjuntos posibles")
+        return busqueda_exhaustiva(fitness, n_features, names)
+
+    if memoizar:
+        fitness = FitnessMemoizado(fitness)
+    rng = np.random.default_rng(seed)
+    population = rng.integers(0, 2, size=(population_size, n_features), dtype=np.uint8)
+    n_parejas = (population_size + 1) // 2
+
+    best_overall_fitness = 0
+    best_overall_individual = np.zeros(n_features, dtype=np.uint8)
+    ultima_mejora = 0
+
+    for generation in range(num_generations):
+        # Reducir la tasa de mutación a la mitad de las generaciones
+        rate = final_mutation_rate if generation > num_generations // 2 else mutation_rate
+
+        # Fitness de toda la población en una sola operación
+        fitness_scores = fitness(population)
+        if instrumentacion.activa:
+            instrumentacion.contar("genetico.generaciones")
+            instrumentacion.contar("genetico.individuos_evaluados", len(population))
+
+        # Mejor individuo de la generación actual
+        best_index = int(np.argmax(fitness_scores))
+        best_fitness = fitness_scores[best_index]
+        mejora = best_fitness > best_overall_fitness
+        if mejora:
+            best_overall_fitness = best_fitness
+            best_overall_individual = population[best_index].copy()
+            ultima_mejora = generation
+
+        if verbose and (mejora or generation % log_cada == 0):
+            selected_features = [names[i] for i in np.flatnonzero(population[best_index])]
+            print(f"Generación {generation + 1}")
+            print(f"Mejor fitness de la generación: {best_fitness:.2f}")
+            print(f"Características seleccionadas: {selected_features}")
+
+        if memoizar and len(fitness) == n_subconjuntos:
+            # Todos los subconjuntos ya están evaluados: el mejor es el óptimo
+            best_overall_individual, best_overall_fitness = fitness.mejor(n_features)
+            if verbose:
+                print(f"Espacio completo evaluado en la generación {generation + 1}")
+            break
+        if paciencia is not None and generation - ultima_mejora >= paciencia:
+            if verbose:
+                print(f"Sin mejora en {paciencia} generaciones: fin en la generación {generation + 1}")
+            break
+
+        # Selección, cruce y mutación de la siguiente generación
+        padres = seleccion_ruleta(fitness_scores, 2 * n_parejas, rng)
+        hijos1, hijos2 = cruce_poblacion(population[padres[:n_parejas]], population[padres[n_parejas:]],
+                                         crossover_rate, rng)
+        hijos = np.stack([hijos1, hijos2], axis=1).reshape(-1, n_features)[:population_size]
+        population = mutacion_poblacion(hijos, rate, rng)
+
+    if verbose and memoizar:
+        print(f"Evaluaciones de fitness: {fitness.evaluaciones} ({len(fitness)} subconjuntos distintos)")
+    best_overall_features = [names[i] for i in np.flatnonzero(best_overall_individual)]
+    return best_overall_features, best_overall_fitness
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Selección de características con un algoritmo genético")
+    parser.add_argument("--csv", default='../weather-prediction-with-climate-extended.csv')  # Cambia la ruta según tu archivo
+    parser.add_argument("--poblacion", type=int, default=population_size)
+    parser.add_argument("--generaciones", type=int, default=num_generations)
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--paciencia", type=int, default=100,
+                        help="Generaciones sin mejora antes de detenerse")
+    parser.add_argument("--log-cada", type=int, default=100,
+                        help="Mostrar el progreso cada N generaciones (y siempre que haya mejora)")
+    parser.add_argument("--exhaustivo-hasta", type=int, default=4096,
+                        help="Evaluar todos los subconjuntos si hay como mucho este número")
+    parser.add_argument("--bins", type=int, default=None,
+                        help="Discretizar las características en este número de intervalos para la información mutua")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos para calcular la información mutua y el fitness envolvente en paralelo")
+    parser.add_argument("--fitness", choices=("informacion", "envolvente"), default="informacion",
+                        help="Suma de información mutua o precisión en validación cruzada de un clasificador")
+    parser.add_argument("--modelo", choices=modelos_envolvente, default="arbol",
+                        help="Clasificador del fitness envolvente")
+    parser.add_argument("--cv", type=int, default=5, help="Folds de validación cruzada del fitness envolvente")
+    parser.add_argument("--cache", default="fitness_envolvente.json",
+                        help="Caché en disco del fitness envolvente")
+    parser.add_argument("--original", action="store_true",
+                        help="Usar la implementación original, individuo a individuo")
+    args = parser.parse_args(argv)
+
+    X, y = cargar_datos(args.csv)
+
+    # Calcular la información mutua para cada característica respecto a Clima
+    info_mutua = informacion_mutua_vectorizada(X[feature_columns], y, bins=args.bins, procesos=args.procesos)
+
+    inicio = time.perf_counter()
+    if args.original:
+        best_overall_features, _ = algoritmo_genetico(info_mutua, args.poblacion, args.generaciones)
+    elif args.fitness == "envolvente":
+        with FitnessEnvolvente(X[feature_columns], y, args.modelo, args.cv, args.procesos, args.cache) as fitness:
+            best_overall_features, _ = algoritmo_genetico_vectorizado(info_mutua, args.poblacion, args.generaciones,
+                                                                      seed=args.semilla, fitness=fitness,
+                                                                      paciencia=args.paciencia,
+                                                                      log_cada=args.log_cada,
+                                                                      exhaustivo_hasta=args.exhaustivo_hasta)
+            print(f"Subconjuntos entrenados en esta ejecución: {fitness.evaluaciones}")
+    else:
+        best_overall_features, _ = algoritmo_genetico_vectorizado(info_mutua, args.poblacion, args.generaciones,
+                                                                  seed=args.semilla, paciencia=args.paciencia,
+                                                                  log_cada=args.log_cada,
+                                                                  exhaustivo_hasta=args.exhaustivo_hasta)
+    segundos = time.perf_counter() - inicio
 
-    # Actualizar el mejor individuo global
-    if best_fitness > best_overall_fitness:
-        best_overall_fitness = best_fitness
-        best_overall_features = selected_features
+    # Resultados finales
+    print("\nCaracterísticas seleccionadas por el algoritmo genético:", best_overall_features)
+    print(f"Tiempo de búsqueda: {segundos:.3f} s")
 
-    print(f"Generación {generation + 1}")
-    print(f"Mejor fitness de la generación: {best_fitness:.2f}")
-    print(f"Características seleccionadas: {selected_features}")
 
-# Resultados finales
-print("\nCaracterísticas seleccionadas por el algoritmo genético:", best_overall_features)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+
+# Instrumentación opcional de los bucles internos: contadores (reglas
+# recorridas por consulta, filas filtradas en cada paso de PRISM, ...) y
+# cronómetros por etapa. Está desactivada por defecto y se activa con la
+# variable de entorno CLIMA_INSTRUMENTACION o llamando a activar():
+#
+#     CLIMA_INSTRUMENTACION=1 python prism.py            # resumen en stderr al terminar
+#     CLIMA_INSTRUMENTACION=perfil.json python prism.py  # resumen en un JSON
+#
+# El código instrumentado comprueba `instrumentacion.activa` antes de contar,
+# así que desactivada solo cuesta leer un atributo. Los contadores son del
+# proceso actual: con --procesos > 1 no incluyen el trabajo de los procesos
+# trabajadores.
+
+VARIABLE_ENTORNO = 'CLIMA_INSTRUMENTACION'
+
+activa = os.environ.get(VARIABLE_ENTORNO, '') not in ('', '0')
+contadores = {}
+tiempos = {}  # nombre -> [llamadas, segundos]
+
+
+def activar(valor=True):
+    global activa
+    activa = valor
+
+
+def reiniciar():
+    contadores.clear()
+    tiempos.clear()
+
+
+def contar(nombre, n=1):
+    contadores[nombre] = contadores.get(nombre, 0) + n
+
+
+def sumar_tiempo(nombre, segundos):
+    registro = tiempos.setdefault(nombre, [0, 0.0])
+    registro[0] += 1
+    registro[1] += segundos
+
+
+def cronometrado(nombre):
+    # Decorador para funciones de etapa (no para funciones por fila)
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not activa:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                sumar_tiempo(nombre, time.perf_counter() - inicio)
+        return envoltura
+    return decorador
+
+
+def resumen():
+    return {
+        "contadores": dict(sorted(contadores.items())),
+        "tiempos": {nombre: {"llamadas": llamadas, "segundos": round(segundos, 6)}
+                    for nombre, (llamadas, segundos) in sorted(tiempos.items())},
+    }
+
+
+def imprimir(archivo=None):
+    archivo = archivo or sys.stderr
+    datos = resumen()
+    if datos["tiempos"]:
+        print("Tiempos por etapa:", file=archivo)
+        for nombre, t in datos["tiempos"].items():
+            print(f"  {nombre:40s} {t['segundos']:10.4f} s  ({t['llamadas']} llamadas)", file=archivo)
+    if datos["contadores"]:
+        print("Contadores:", file=archivo)
+        for nombre, valor in datos["contadores"].items():
+            print(f"  {nombre:40s} {valor:>14,}", file=archivo)
+    # Cocientes más útiles cuando se han medido los dos términos
+    for numerador, denominador, texto in (("inferencia.reglas_recorridas", "inferencia.consultas_lista",
+                                           "reglas recorridas por consulta (lista)"),
+                                          ("apply_rules.reglas_recorridas", "apply_rules.filas",
+                                           "reglas recorridas por fila (apply_rules)"),
+                                          ("prism.filas_filtradas", "prism.pasos",
+                                           "filas filtradas por paso de PRISM")):
+        if contadores.get(denominador):
+            print(f"  {texto}: {contadores.get(numerador, 0) / contadores[denominador]:.1f}", file=archivo)
+
+
+def _al_terminar():
+    if not (contadores or tiempos):
+        return
+    destino = os.environ.get(VARIABLE_ENTORNO, '')
+    if destino.endswith('.json'):
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(resumen(), f, ensure_ascii=False, indent=4)
+    else:
+        imprimir()
+
+
+if activa:
+    atexit.register(_al_terminar)
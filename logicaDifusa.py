@@ -1,8 +1,14 @@
 import json
-import matplotlib.pyplot as plt
-import streamlit as st
+import os
+import numpy as np
 from collections import Counter
 
+import instrumentacion
+
+# matplotlib y streamlit solo se importan dentro de las funciones de la
+# interfaz: el uso por lotes (prediccionLotes.py, tablaInferencia.py) no paga
+# su tiempo de importación.
+
 # Membresía para Cloud Cover
 def cloud_cover_low(x):
     if x <= 0:
@@ -144,13 +150,225 @@ def fuzzify_inputs(humidity, cloud_cover, pressure, precipitation, sunshine, tem
         "temp_mean_cat": get_category(temp_mean, temp_mean_low, temp_mean_medium, temp_mean_high)
     }
 
+# --- Etapa 1 (lotes): Fuzzificación vectorizada ---
+# Versiones NumPy de las funciones de membresía. Cada una reproduce las mismas
+# ramas y las mismas operaciones que su versión escalar, de modo que el
+# resultado es idéntico bit a bit (incluidos los valores en las fronteras).
+def _cloud_cover_low_v(x):
+    return np.select([x <= 0, (0 < x) & (x < 3)], [1.0, (3 - x) / 3], 0.0)
+
+def _cloud_cover_medium_v(x):
+    return np.select([(1 <= x) & (x <= 4), (4 < x) & (x <= 6)], [(x - 1) / 3, (6 - x) / 2], 0.0)
+
+def _cloud_cover_high_v(x):
+    return np.select([(5 <= x) & (x <= 7), x > 7], [(x - 5) / 2, 1.0], 0.0)
+
+def _humidity_low_v(x):
+    return np.select([x <= 2, (2 < x) & (x < 64)], [1.0, (64 - x) / 62], 0.0)
+
+def _humidity_medium_v(x):
+    return np.select([(64 <= x) & (x <= 77), (77 < x) & (x <= 99)], [(x - 64) / 13, (99 - x) / 22], 0.0)
+
+def _humidity_high_v(x):
+    return np.select([(81 <= x) & (x <= 99), x > 99], [(x - 81) / 18, 1.0], 0.0)
+
+def _pressure_low_v(x):
+    return np.select([x <= 1001, (1001 < x) & (x < 1016)], [1.0, (1016 - x) / (1016 - 1001)], 0.0)
+
+def _pressure_medium_v(x):
+    return np.select([(1001 <= x) & (x <= 1015), (1015 < x) & (x <= 1035)],
+                     [(x - 1001) / (1015 - 1001), (1035 - x) / (1035 - 1015)], 0.0)
+
+def _pressure_high_v(x):
+    return np.select([(1016 <= x) & (x <= 1026), x > 1026], [(x - 1016) / 10, 1.0], 0.0)
+
+def _precipitation_low_v(x):
+    return np.select([x <= 1, (1 < x) & (x < 131)], [1.0, (131 - x) / 130], 0.0)
+
+def _precipitation_medium_v(x):
+    return np.select([(131 <= x) & (x <= 179), (179 < x) & (x <= 199)],
+                     [(x - 131) / (179 - 131), (199 - x) / (199 - 179)], 0.0)
+
+def _precipitation_high_v(x):
+    return np.select([(199 <= x) & (x <= 209), x > 209], [(x - 199) / 10, 1.0], 0.0)
+
+def _sunshine_low_v(x):
+    return np.select([x <= 1, (1 < x) & (x < 59)], [1.0, (59 - x) / 58], 0.0)
+
+def _sunshine_medium_v(x):
+    return np.select([(59 <= x) & (x <= 89), (89 < x) & (x <= 99)], [(x - 59) / 30, (99 - x) / 10], 0.0)
+
+def _sunshine_high_v(x):
+    return np.select([(99 <= x) & (x <= 140), x > 140], [(x - 99) / 41, 1.0], 0.0)
+
+def _temp_mean_low_v(x):
+    return np.select([x <= 31, (31 < x) & (x < 63)], [1.0, (63 - x) / (63 - 31)], 0.0)
+
+def _temp_mean_medium_v(x):
+    return np.select([(63 <= x) & (x <= 89), (89 < x) & (x <= 99)],
+                     [(x - 63) / (89 - 63), (99 - x) / (99 - 89)], 0.0)
+
+def _temp_mean_high_v(x):
+    return np.select([(99 <= x) & (x <= 140), x > 140], [(x - 99) / 41, 1.0], 0.0)
+
+# Variables de entrada, en el orden de fuzzify_inputs, con sus funciones de
+# membresía (baja, media, alta) vectorizadas
+membership_functions_v = {
+    "humidity": (_humidity_low_v, _humidity_medium_v, _humidity_high_v),
+    "cloud_cover": (_cloud_cover_low_v, _cloud_cover_medium_v, _cloud_cover_high_v),
+    "pressure": (_pressure_low_v, _pressure_medium_v, _pressure_high_v),
+    "precipitation": (_precipitation_low_v, _precipitation_medium_v, _precipitation_high_v),
+    "sunshine": (_sunshine_low_v, _sunshine_medium_v, _sunshine_high_v),
+    "temp_mean": (_temp_mean_low_v, _temp_mean_medium_v, _temp_mean_high_v),
+}
+
+# Variables de entrada, en el orden de los argumentos de fuzzify_inputs
+INPUT_VARIABLES = list(membership_functions_v)
+
+@instrumentacion.cronometrado("fuzzify_batch")
+def fuzzify_batch(data):
+    # `data` puede ser un DataFrame o cualquier mapeo columna -> array con las
+    # columnas de weather_prediction.csv. Devuelve dos diccionarios:
+    #   memberships[var]      -> array (N, 3) con los grados baja/media/alta
+    #   categories[var_cat]   -> array (N,) con el argmax (mismo desempate que
+    #                            fuzzify_inputs: gana la primera categoría), o
+    #                            -1 si el valor es nulo o infinito
+    memberships = {}
+    categories = {}
+    for var, funcs in membership_functions_v.items():
+        # Se trabaja en float64, igual que la aritmética escalar de Python, para
+        # no desbordar tipos enteros compactos (int8/int16)
+        x = np.asarray(data[var], dtype=np.float64)
+        degrees = np.column_stack([func(x) for func in funcs])
+        memberships[var] = degrees
+        categories[var + "_cat"] = np.where(np.isfinite(x), np.argmax(degrees, axis=1), -1)
+    return memberships, categories
+
 # --- Etapa 2: Inferencia ---
 def load_rules(filename):
+    # Los archivos en el formato binario de reglasBinarias.py se mapean en
+    # memoria y se devuelven ya compilados; los JSON se devuelven como lista
+    if filename.endswith(".bin"):
+        from reglasBinarias import leer_reglas_binario
+        return CompiledRules.from_arrays(**leer_reglas_binario(filename))
     with open(filename, "r") as file:
         rules = json.load(file)
     return rules
 
+def _bitmask(selected):
+    # Array booleano -> entero de Python con el bit i encendido si selected[i]
+    return int.from_bytes(np.packbits(selected, bitorder="little").tobytes(), "little")
+
+# Índice compilado de reglas: para cada atributo y cada valor se guarda, como
+# máscara de bits (un entero de Python), el conjunto de reglas compatibles con
+# ese valor: las que no mencionan el atributo más las que exigen ese valor.
+# Una consulta es el AND de una máscara por atributo y los bits encendidos, en
+# orden creciente, son las reglas que disparan en el mismo orden del JSON.
+class CompiledRules:
+    def __init__(self, rules):
+        self.consequents = [rule["consequent"]["value"] for rule in rules]
+        self.all_rules = (1 << len(rules)) - 1
+
+        required = {}  # atributo -> {índice de regla: conjunto de valores exigidos}
+        for index, rule in enumerate(rules):
+            for antecedent in rule["antecedent"]:
+                attr_rules = required.setdefault(antecedent["attribute"], {})
+                attr_rules.setdefault(index, set()).add(antecedent["value"])
+
+        self.free = {}      # atributo -> reglas que no lo mencionan
+        self.by_value = {}  # atributo -> {valor: reglas que exigen ese valor}
+        for attr, attr_rules in required.items():
+            mentioned = 0
+            by_value = {}
+            for index, values in attr_rules.items():
+                mentioned |= 1 << index
+                # Una regla que exige dos valores distintos del mismo atributo
+                # nunca puede cumplirse
+                if len(values) == 1:
+                    value = next(iter(values))
+                    by_value[value] = by_value.get(value, 0) | (1 << index)
+            self.free[attr] = self.all_rules & ~mentioned
+            self.by_value[attr] = by_value
+
+    @classmethod
+    def from_arrays(cls, attributes, classes, offsets, attribute_ids, values, class_ids):
+        # Construye el mismo índice a partir del formato binario de
+        # reglasBinarias.py: la regla i tiene las condiciones
+        # offsets[i]:offsets[i + 1] de (attribute_ids, values) y la clase
+        # classes[class_ids[i]]. Las máscaras se obtienen con np.packbits sin
+        # recorrer las reglas una a una en Python.
+        self = cls.__new__(cls)
+        n_rules = len(class_ids)
+        self.consequents = [classes[class_id] for class_id in np.asarray(class_ids).tolist()]
+        self.all_rules = (1 << n_rules) - 1
+        self.free = {}
+        self.by_value = {}
+
+        rule_ids = np.repeat(np.arange(n_rules), np.diff(offsets))
+        attribute_ids = np.asarray(attribute_ids)
+        values = np.asarray(values)
+        for attr_id, attr in enumerate(attributes):
+            selected = attribute_ids == attr_id
+            if not selected.any():
+                continue
+            attr_rules = rule_ids[selected]
+            attr_values = values[selected]
+            mentioned = np.zeros(n_rules, dtype=bool)
+            mentioned[attr_rules] = True
+            # Una regla que exige dos valores distintos del mismo atributo
+            # nunca puede cumplirse
+            first_value = np.zeros(n_rules, dtype=attr_values.dtype)
+            first_value[attr_rules[::-1]] = attr_values[::-1]
+            conflicting = np.zeros(n_rules, dtype=bool)
+            conflicting[attr_rules[attr_values != first_value[attr_rules]]] = True
+            single_value = mentioned & ~conflicting
+            by_value = {}
+            for value in np.unique(attr_values).tolist():
+                by_value[value] = _bitmask(single_value & (first_value == value))
+            self.free[attr] = _bitmask(~mentioned)
+            self.by_value[attr] = by_value
+        return self
+
+    def __len__(self):
+        return len(self.consequents)
+
+    def match_mask(self, fuzzified_inputs):
+        mask = self.all_rules
+        for attr, by_value in self.by_value.items():
+            mask &= self.free[attr] | by_value.get(fuzzified_inputs.get(attr), 0)
+            if not mask:
+                break
+        return mask
+
+    def matching_indices(self, fuzzified_inputs):
+        mask = self.match_mask(fuzzified_inputs)
+        indices = []
+        while mask:
+            lowest = mask & -mask
+            indices.append(lowest.bit_length() - 1)
+            mask ^= lowest
+        return indices
+
+    def infer(self, fuzzified_inputs):
+        return [self.consequents[index] for index in self.matching_indices(fuzzified_inputs)]
+
+
+def compile_rules(rules):
+    if isinstance(rules, CompiledRules):
+        return rules
+    return CompiledRules(rules)
+
+
 def infer_consequent(fuzzified_inputs, rules):
+    if isinstance(rules, CompiledRules):
+        results = rules.infer(fuzzified_inputs)
+        if instrumentacion.activa:
+            # El índice no recorre las reglas: combina una máscara por
+            # atributo y solo visita los bits de las reglas que disparan
+            instrumentacion.contar("inferencia.consultas_indice")
+            instrumentacion.contar("inferencia.reglas_disparadas", len(results))
+        return results
+
     results = []
     for rule in rules:
         match = True
@@ -162,6 +380,10 @@ def infer_consequent(fuzzified_inputs, rules):
                 break
         if match:
             results.append(rule["consequent"]["value"])
+    if instrumentacion.activa:
+        instrumentacion.contar("inferencia.consultas_lista")
+        instrumentacion.contar("inferencia.reglas_recorridas", len(rules))
+        instrumentacion.contar("inferencia.reglas_disparadas", len(results))
     return results
 
 # --- Etapa 3: Agregación ---
@@ -192,10 +414,197 @@ def defuzzify_results(results):
     crisp_value = weighted_sum / total_weight if total_weight > 0 else None
     return crisp_value
 
+# --- Pipeline completo por lotes ---
+@instrumentacion.cronometrado("predict_batch")
+def predict_batch(categories, rules):
+    # Aplica inferencia, agregación y defuzzificación a un lote de categorías
+    # (el segundo resultado de fuzzify_batch). Como hay pocas combinaciones de
+    # categorías distintas, se infiere una sola vez por combinación y el
+    # resultado se reparte a todas las filas que la comparten. Un código
+    # negativo (lectura nula, en fuzzify_batch y en cluster.assign) no tiene
+    # categoría: esas filas dan "No prediction", como en la tabla de inferencia.
+    rules = compile_rules(rules)
+    attrs = list(categories)
+    codes = np.column_stack([np.asarray(categories[attr]) for attr in attrs])
+    combinations, inverse = np.unique(codes, axis=0, return_inverse=True)
+
+    combo_predictions = np.empty(len(combinations), dtype=object)
+    combo_crisp = np.full(len(combinations), np.nan)
+    for index, combination in enumerate(combinations.tolist()):
+        if min(combination) < 0:
+            combo_predictions[index] = "No prediction"
+            continue
+        results = infer_consequent(dict(zip(attrs, combination)), rules)
+        if not results:
+            combo_predictions[index] = "No prediction"
+            continue
+        predicted_clima, all_results = aggregate_results(results)
+        combo_predictions[index] = predicted_clima
+        combo_crisp[index] = defuzzify_results(all_results)
+
+    inverse = inverse.reshape(-1)
+    if instrumentacion.activa:
+        instrumentacion.contar("predict_batch.filas", len(inverse))
+        instrumentacion.contar("predict_batch.combinaciones", len(combinations))
+    return combo_predictions[inverse], combo_crisp[inverse]
+
+# --- Inferencia difusa graduada ---
+# En lugar de quedarse con la categoría de mayor membresía y exigir que las
+# reglas coincidan exactamente, cada regla se activa con una fuerza igual al
+# mínimo (o el producto) de las membresías de sus antecedentes. Las reglas se
+# guardan como una matriz (reglas x variables) de índices en la membresía de
+# cada variable, ampliada con dos columnas fijas: la 3 vale siempre 0 (valores
+# que la fuzzificación no produce, como la categoría 3 de k-means) y la 4
+# vale siempre 1 (la regla no menciona la variable). Así las fuerzas de todas
+# las reglas para un lote de entradas son una indexación por variable y un
+# np.minimum (o np.multiply) acumulado.
+#
+# Agregación: el peso de cada clase es la suma de las fuerzas de sus reglas y
+# gana la de mayor peso (a igualdad, la que aparece antes en las reglas).
+# Defuzzificación: media de clima_values ponderada por las fuerzas. Si
+# ninguna regla se activa, "No prediction" y NaN, como en predict_batch.
+GRADED_TNORMS = ("min", "product")
+_ZERO_SLOT = 3
+_ONE_SLOT = 4
+
+
+class GradedRules:
+    def __init__(self, rules, tnorm="min"):
+        antecedents = [[(c["attribute"], c["value"]) for c in rule["antecedent"]] for rule in rules]
+        self._build(antecedents, [rule["consequent"]["value"] for rule in rules], tnorm)
+
+    @classmethod
+    def from_arrays(cls, attributes, classes, offsets, attribute_ids, values, class_ids, tnorm="min"):
+        # Mismo índice a partir del formato binario de reglasBinarias.py
+        self = cls.__new__(cls)
+        attribute_ids = np.asarray(attribute_ids).tolist()
+        values = np.asarray(values).tolist()
+        offsets = np.asarray(offsets).tolist()
+        antecedents = [[(attributes[attribute_ids[k]], values[k]) for k in range(offsets[i], offsets[i + 1])]
+                       for i in range(len(offsets) - 1)]
+        self._build(antecedents, [classes[c] for c in np.asarray(class_ids).tolist()], tnorm)
+        return self
+
+    def _build(self, antecedents, consequents, tnorm):
+        if tnorm not in GRADED_TNORMS:
+            raise ValueError(f"T-norma desconocida: {tnorm!r} (opciones: {', '.join(GRADED_TNORMS)})")
+        self.tnorm = tnorm
+        self.variables = list(membership_functions_v)
+        position = {var + "_cat": a for a, var in enumerate(self.variables)}
+        self.classes = list(dict.fromkeys(consequents))
+        class_index = {clase: k for k, clase in enumerate(self.classes)}
+
+        index = np.full((len(consequents), len(self.variables)), _ONE_SLOT, dtype=np.intp)
+        for r, conditions in enumerate(antecedents):
+            for attr, value in conditions:
+                # Una variable desconocida, un valor fuera de 0..2 o dos valores
+                # distintos para la misma variable hacen la regla imposible
+                a = position.get(attr)
+                if a is None:
+                    index[r] = _ZERO_SLOT
+                    break
+                valid = isinstance(value, (int, np.integer)) and 0 <= value < _ZERO_SLOT
+                if not valid or index[r, a] not in (_ONE_SLOT, value):
+                    index[r, a] = _ZERO_SLOT
+                else:
+                    index[r, a] = value
+        self.index = index
+        self._groups = [self.variables[a:a + 3] for a in range(0, len(self.variables), 3)]
+        self._group_index = []
+        for a in range(0, len(self.variables), 3):
+            columns = np.zeros(len(index), dtype=np.intp)
+            for b in range(a, min(a + 3, len(self.variables))):
+                columns = columns * 5 + index[:, b]
+            self._group_index.append(columns)
+        self.class_ids = np.array([class_index[c] for c in consequents], dtype=np.intp)
+        self.class_values = np.array([clima_values.get(c, np.nan) for c in self.classes])
+        self._names = np.array(self.classes + ["No prediction"], dtype=object)
+
+    def __len__(self):
+        return len(self.class_ids)
+
+    def firing_strengths(self, memberships):
+        # memberships[var] -> (N, 3), como devuelve fuzzify_batch. Devuelve
+        # (N, reglas). Las variables se agrupan de tres en tres: para cada
+        # grupo se calcula la combinación (mínimo o producto) de las 5^3
+        # posibles columnas una sola vez por fila, y cada regla necesita
+        # entonces un único índice por grupo en lugar de uno por variable.
+        combine = np.minimum if self.tnorm == "min" else np.multiply
+        strengths = None
+        for group, columns in zip(self._groups, self._group_index):
+            joint = None
+            for var in group:
+                degrees = np.asarray(memberships[var], dtype=np.float64)
+                padded = np.empty((len(degrees), 5))
+                padded[:, :3] = degrees
+                padded[:, _ZERO_SLOT] = 0.0
+                padded[:, _ONE_SLOT] = 1.0
+                joint = padded if joint is None else \
+                    combine(joint[:, :, None], padded[:, None, :]).reshape(len(degrees), -1)
+            gathered = joint[:, columns]
+            strengths = gathered if strengths is None else combine(strengths, gathered, out=strengths)
+        return strengths
+
+    def class_weights(self, memberships, block=512):
+        # Suma de fuerzas por clase, (N, clases). Se procesa por bloques de
+        # filas para que la matriz filas x reglas quepa en la caché del
+        # procesador (con 1190 reglas, 512 filas es bastante más rápido que 4096).
+        n = len(next(iter(memberships.values())))
+        one_hot = np.zeros((len(self.class_ids), len(self.classes)))
+        one_hot[np.arange(len(self.class_ids)), self.class_ids] = 1.0
+        weights = np.empty((n, len(self.classes)))
+        for start in range(0, n, block):
+            part = {var: np.asarray(memberships[var])[start:start + block] for var in self.variables}
+            weights[start:start + block] = self.firing_strengths(part) @ one_hot
+        return weights
+
+    @instrumentacion.cronometrado("graduada.predict")
+    def predict(self, memberships, block=512):
+        # Mismo formato que predict_batch: clase (o "No prediction") y valor crisp
+        weights = self.class_weights(memberships, block)
+        if instrumentacion.activa:
+            instrumentacion.contar("graduada.filas", len(weights))
+            instrumentacion.contar("graduada.activaciones", len(weights) * len(self))
+        total = weights.sum(axis=1)
+        fired = total > 0
+        winner = np.where(fired, weights.argmax(axis=1), len(self.classes))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            crisp = np.where(fired, weights @ np.nan_to_num(self.class_values) / total, np.nan)
+        return self._names[winner], crisp
+
+
+def load_graded_rules(filename, tnorm="min"):
+    if filename.endswith(".bin"):
+        from reglasBinarias import leer_reglas_binario
+        return GradedRules.from_arrays(**leer_reglas_binario(filename), tnorm=tnorm)
+    with open(filename, "r") as file:
+        return GradedRules(json.load(file), tnorm)
+
+
+def predict_graded(data, rules, tnorm="min"):
+    # Fuzzificación + inferencia graduada de un lote (DataFrame o mapeo
+    # columna -> array con las variables de entrada). `rules` puede ser un
+    # GradedRules, la lista de reglas del JSON o la ruta de un archivo de
+    # reglas (.json o .bin). El índice de CompiledRules no conserva los
+    # antecedentes: para un .bin hay que pasar la ruta o usar load_graded_rules.
+    if isinstance(rules, str):
+        rules = load_graded_rules(rules, tnorm)
+    elif isinstance(rules, CompiledRules):
+        raise TypeError("predict_graded necesita los antecedentes de las reglas: usa load_graded_rules(archivo) "
+                        "o pasa la ruta del archivo en lugar de load_rules(archivo)")
+    elif not isinstance(rules, GradedRules):
+        rules = GradedRules(rules, tnorm)
+    memberships, _ = fuzzify_batch(data)
+    return rules.predict(memberships)
+
 # --- Visualización de funciones de membresía ---
 # --- Paso 5: Visualización de funciones de membresía ---
-def plot_membership_functions():
-    fig, axs = plt.subplots(2, 3, figsize=(18, 10))
+def membership_functions_figure():
+    # Figure no usa pyplot ni cambia el backend de matplotlib del proceso
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(18, 10))
+    axs = fig.subplots(2, 3)
     
     # Humidity
     x_vals_humidity = list(range(0, 101))
@@ -260,12 +669,39 @@ def plot_membership_functions():
     for ax in axs.flat:
         ax.set(xlabel="Value", ylabel="Degree of Membership")
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    fig.tight_layout()
+    return fig
+
+def membership_functions_png():
+    import io
+
+    buffer = io.BytesIO()
+    membership_functions_figure().savefig(buffer, format="png")
+    return buffer.getvalue()
+
+def plot_membership_functions():
+    import streamlit as st
+
+    # Las funciones de membresía no cambian: la imagen se dibuja una sola vez
+    # por proceso y se reutiliza en cada interacción con los sliders
+    st.image(st.cache_resource(membership_functions_png)())
+
+def _app_rules(filename, mtime):
+    return compile_rules(load_rules(filename))
+
+def app_rules(filename):
+    import streamlit as st
+
+    # Streamlit vuelve a ejecutar este script en cada interacción, así que la
+    # caché tiene que vivir en st.cache_resource. La fecha de modificación
+    # forma parte de la clave para recargar las reglas si el archivo cambia.
+    return st.cache_resource(_app_rules)(filename, os.path.getmtime(filename))
 
 
 # --- Interfaz interactiva de Streamlit ---
 def interactive_prediction(rules):
+    import streamlit as st
+
     st.title("Sistema de Lógica Difusa para Predicción de Clima")
 
     # Crear sliders para cada variable
@@ -298,8 +734,14 @@ def interactive_prediction(rules):
 
 # --- Ejecutar funciones ---
 if __name__ == "__main__":
-    # Cargar reglas del archivo JSON
-    rules = load_rules("prism_rules.json")
+    # Streamlit vuelve a ejecutar este archivo como __main__ en cada
+    # interacción. Las funciones se toman del módulo importado (que sí persiste
+    # entre ejecuciones) para que las reglas en caché sigan siendo instancias
+    # de la misma clase CompiledRules.
+    import logicaDifusa
+
+    # Cargar reglas del archivo JSON (una vez por proceso)
+    rules = logicaDifusa.app_rules("prism_rules.json")
 
     # Iniciar predicción interactiva con Streamlit
-    interactive_prediction(rules)
+    logicaDifusa.interactive_prediction(rules)
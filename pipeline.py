@@ -0,0 +1,179 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import cluster
+import prism
+from almacenColumnar import cargar_columnar, guardar_columnar
+from cargaDatos import cargar_dataframe
+from reglasBinarias import guardar_reglas_binario
+from tablaInferencia import ATRIBUTOS, construir_tabla, huella_archivo, ruta_tabla
+
+# Ejecución encadenada de las etapas cluster.py -> prism.py -> tablaInferencia.py
+# con caché por contenido. Cada etapa tiene una huella calculada a partir de
+# sus parámetros, del contenido de sus archivos de entrada y del código de los
+# módulos que la implementan. Si la huella coincide con la guardada en el
+# manifiesto y sus salidas siguen intactas, la etapa se omite. El DataFrame
+# clusterizado se guarda en formato columnar (almacenColumnar.py), así que la
+# etapa PRISM no vuelve a analizar el CSV. Cambiar la capa difusa
+# (logicaDifusa.py) solo invalida la tabla de inferencia.
+
+MANIFIESTO = 'manifest.json'
+
+
+def huella_ruta(ruta):
+    # Huella de un archivo o de un directorio (todos sus archivos, ordenados)
+    if not os.path.isdir(ruta):
+        return huella_archivo(ruta)
+    h = hashlib.sha256()
+    for nombre in sorted(os.listdir(ruta)):
+        h.update(nombre.encode('utf-8'))
+        h.update(huella_archivo(os.path.join(ruta, nombre)).encode('ascii'))
+    return h.hexdigest()
+
+
+def huella_etapa(etapa):
+    contenido = {
+        "parametros": etapa["parametros"],
+        "entradas": {ruta: huella_ruta(ruta) for ruta in etapa["entradas"]},
+        "codigo": {ruta: huella_archivo(ruta) for ruta in etapa["codigo"]},
+    }
+    return hashlib.sha256(json.dumps(contenido, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def cargar_manifiesto(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_manifiesto(manifiesto, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=4)
+
+
+def salidas_vigentes(registro):
+    # Las salidas deben existir y no haber sido modificadas desde que se generaron
+    return all(os.path.exists(ruta) and huella_ruta(ruta) == huella
+               for ruta, huella in registro["salidas"].items())
+
+
+# --- Etapas ---
+
+def _clusterizar(args, almacen):
+    df = cargar_dataframe(args.entrada)
+    df, modelos = cluster.clusterizar(df, cluster.columnas, args.n_clusters, args.metodo,
+                                      args.procesos or os.cpu_count())
+    guardar_columnar(df, almacen)
+    # El CSV se sigue generando para los scripts que lo leen directamente
+    df.to_csv(args.clusterizado, index=False)
+    cluster.guardar_modelos(modelos, args.modelos, args.metodo)
+
+
+def _prism(args, almacen):
+    df = cargar_columnar(almacen, prism.columnas_cat + ['Clima'])
+    rules = prism.prism_rapido(df, 'Clima', procesos=args.procesos or os.cpu_count())
+    prism.guardar_reglas_json(rules, args.reglas)
+    guardar_reglas_binario(prism.reglas_a_json(rules), os.path.splitext(args.reglas)[0] + '.bin')
+    print(f"  {len(rules)} reglas, precisión {(prism.apply_rules_vectorizado(rules, df) == df['Clima']).mean():.2f}")
+
+
+def _tabla(args):
+    from logicaDifusa import load_rules
+
+    # Una celda por combinación de clusters: la tabla tiene que cubrir los
+    # mismos códigos que genera la etapa de clusterización
+    tabla = construir_tabla(load_rules(args.reglas), n_codigos=args.n_clusters,
+                            huella=huella_archivo(args.reglas))
+    tabla.guardar(ruta_tabla(args.reglas))
+
+
+def definir_etapas(args):
+    almacen = os.path.join(args.cache, 'clusterizado')
+    reglas_bin = os.path.splitext(args.reglas)[0] + '.bin'
+    return [
+        {
+            "nombre": "clusterizar",
+            "parametros": {"columnas": cluster.columnas, "n_clusters": args.n_clusters, "metodo": args.metodo},
+            "entradas": [args.entrada],
+            "codigo": ["cluster.py", "cargaDatos.py", "almacenColumnar.py"],
+            "salidas": [almacen, args.clusterizado, args.modelos],
+            "ejecutar": lambda: _clusterizar(args, almacen),
+        },
+        {
+            "nombre": "prism",
+            "parametros": {"columnas": prism.columnas_cat, "clase": "Clima"},
+            "entradas": [almacen],
+            "codigo": ["prism.py", "reglasBinarias.py", "almacenColumnar.py"],
+            "salidas": [args.reglas, reglas_bin],
+            "ejecutar": lambda: _prism(args, almacen),
+        },
+        {
+            "nombre": "tabla",
+            "parametros": {"atributos": ATRIBUTOS, "n_codigos": args.n_clusters},
+            "entradas": [args.reglas],
+            "codigo": ["tablaInferencia.py", "logicaDifusa.py"],
+            "salidas": [ruta_tabla(args.reglas)],
+            "ejecutar": lambda: _tabla(args),
+        },
+    ]
+
+
+def ejecutar(etapas, manifiesto_filename, forzar=()):
+    # Ejecuta en orden las etapas cuya huella ha cambiado; devuelve los
+    # nombres de las etapas ejecutadas
+    manifiesto = cargar_manifiesto(manifiesto_filename)
+    ejecutadas = []
+    for etapa in etapas:
+        nombre = etapa["nombre"]
+        huella = huella_etapa(etapa)
+        registro = manifiesto.get(nombre)
+        if (nombre not in forzar and "todas" not in forzar and registro
+                and registro["huella"] == huella and salidas_vigentes(registro)):
+            print(f"[{nombre}] al día, se omite")
+            continue
+
+        print(f"[{nombre}] ejecutando...")
+        inicio = time.perf_counter()
+        etapa["ejecutar"]()
+        segundos = time.perf_counter() - inicio
+        print(f"[{nombre}] terminada en {segundos:.2f} s")
+
+        manifiesto[nombre] = {
+            "huella": huella,
+            "salidas": {ruta: huella_ruta(ruta) for ruta in etapa["salidas"]},
+            "segundos": round(segundos, 3),
+        }
+        guardar_manifiesto(manifiesto, manifiesto_filename)
+        ejecutadas.append(nombre)
+    return ejecutadas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline clusterización -> PRISM -> tabla de inferencia con caché")
+    parser.add_argument("--entrada", default='weather_prediction.csv')
+    parser.add_argument("--clusterizado", default='weather_prediction_clusterizado.csv')
+    parser.add_argument("--modelos", default='modelos_cluster.json')
+    parser.add_argument("--reglas", default='prism_rules.json')
+    parser.add_argument("--metodo", choices=cluster.metodos, default='kmeans')
+    parser.add_argument("--n-clusters", type=int, default=cluster.n_clusters)
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos para clusterizar y entrenar PRISM (0 = todos los núcleos)")
+    parser.add_argument("--cache", default='.pipeline',
+                        help="Directorio del manifiesto y de los datos intermedios en formato columnar")
+    parser.add_argument("--forzar", nargs='*', default=(), metavar="ETAPA",
+                        help="Ejecutar estas etapas aunque estén al día ('todas' para todas)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.cache, exist_ok=True)
+    inicio = time.perf_counter()
+    ejecutadas = ejecutar(definir_etapas(args), os.path.join(args.cache, MANIFIESTO), set(args.forzar))
+    print(f"Pipeline completado en {time.perf_counter() - inicio:.2f} s "
+          f"({len(ejecutadas)} etapas ejecutadas).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cluster import assign, cargar_modelos
+from logicaDifusa import (GRADED_TNORMS, INPUT_VARIABLES, GradedRules, compile_rules, fuzzify_batch,
+                          load_graded_rules, load_rules, predict_batch)
+from tablaInferencia import TablaInferencia, cargar_tabla
+
+# Predicción por lotes (sin Streamlit): lee un CSV por bloques de tamaño fijo,
+# aplica fuzzificación -> inferencia -> agregación -> defuzzificación y va
+# escribiendo el resultado a disco, de modo que la memoria usada depende del
+# tamaño del bloque y no del tamaño del archivo.
+#
+# Uso:
+#     python prediccionLotes.py weather-prediction-with-climate-extended.csv predicciones.csv
+#
+# Con --procesos N los bloques se reparten entre N procesos. Cada proceso
+# recibe el índice compilado de reglas una única vez al arrancar y los
+# bloques se escriben en el mismo orden en que se leyeron.
+#
+# Con --tabla la inferencia se resuelve con la tabla precalculada de
+# tablaInferencia.py (se reconstruye sola si las reglas han cambiado).
+#
+# Con --modelos-cluster las categorías *_cat no se obtienen con las funciones
+# de membresía sino asignando cada lectura al centroide más cercano de los
+# modelos guardados por cluster.py, es decir, con los mismos códigos con los
+# que se aprendieron las reglas PRISM.
+#
+# Con --inferencia min|product se usa la inferencia difusa graduada de
+# logicaDifusa.py (fuerza de cada regla = mínimo o producto de las
+# membresías) en lugar de la coincidencia exacta de categorías.
+
+
+def procesar_bloque(bloque, rules, modelos_cluster=None):
+    if modelos_cluster is None:
+        memberships, categorias = fuzzify_batch(bloque)
+    else:
+        categorias = assign(bloque, modelos_cluster)
+    if isinstance(rules, GradedRules):
+        predicciones, valores_crisp = rules.predict(memberships)
+    elif isinstance(rules, TablaInferencia):
+        predicciones, valores_crisp = rules.predict(categorias)
+    else:
+        predicciones, valores_crisp = predict_batch(categorias, rules)
+    # Las lecturas nulas o infinitas tienen código -1 en los dos caminos de
+    # categorización. predict_batch y la tabla ya dan "No prediction" para esas
+    # filas; aquí se aplica lo mismo a la inferencia graduada
+    invalidas = np.zeros(len(bloque), dtype=bool)
+    for codigos in categorias.values():
+        invalidas |= np.asarray(codigos) < 0
+    if invalidas.any():
+        predicciones = np.where(invalidas, "No prediction", predicciones).astype(object)
+        valores_crisp = np.where(invalidas, np.nan, valores_crisp)
+    resultado = bloque.copy()
+    # Las columnas *_cat salen en el orden de fuzzify_batch en los dos caminos
+    for var in INPUT_VARIABLES:
+        resultado[var + '_cat'] = categorias[var + '_cat']
+    resultado['Predicción'] = predicciones
+    resultado['Valor_Crisp'] = valores_crisp
+    return resultado
+
+
+def bloque_a_csv(bloque, rules, cabecera, modelos_cluster=None):
+    # El formateo a CSV se hace en el mismo proceso que la predicción para que
+    # también se reparta entre los trabajadores
+    return procesar_bloque(bloque, rules, modelos_cluster).to_csv(header=cabecera, index=False)
+
+
+# Índice de reglas y modelos de cluster de cada proceso trabajador (solo lectura)
+_rules_trabajador = None
+_modelos_trabajador = None
+
+
+def _iniciar_trabajador(rules, modelos_cluster):
+    global _rules_trabajador, _modelos_trabajador
+    _rules_trabajador = rules
+    _modelos_trabajador = modelos_cluster
+
+
+def _bloque_a_csv_trabajador(bloque, cabecera):
+    return bloque_a_csv(bloque, _rules_trabajador, cabecera, _modelos_trabajador)
+
+
+def _leer_bloques(entrada, chunksize):
+    for bloque in pd.read_csv(entrada, chunksize=chunksize):
+        bloque.columns = bloque.columns.str.strip()
+        yield bloque
+
+
+def predecir_csv(entrada, salida, rules, chunksize=100_000, procesos=1, modelos_cluster=None):
+    # La inferencia graduada necesita las membresías de fuzzify_batch, que el
+    # camino de los centroides no calcula
+    if isinstance(rules, GradedRules) and modelos_cluster is not None:
+        raise ValueError("La inferencia graduada no es compatible con modelos_cluster")
+    if not isinstance(rules, (TablaInferencia, GradedRules)):
+        rules = compile_rules(rules)
+    filas = 0
+    inicio = time.perf_counter()
+    with open(salida, 'w', encoding='utf-8', newline='') as f:
+        if procesos <= 1:
+            for numero, bloque in enumerate(_leer_bloques(entrada, chunksize)):
+                f.write(bloque_a_csv(bloque, rules, numero == 0, modelos_cluster))
+                filas += len(bloque)
+        else:
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                     initargs=(rules, modelos_cluster)) as executor:
+                # Ventana acotada de bloques en vuelo: la memoria sigue sin
+                # depender del tamaño del archivo y el orden de escritura es
+                # el de lectura
+                pendientes = deque()
+                for numero, bloque in enumerate(_leer_bloques(entrada, chunksize)):
+                    pendientes.append(executor.submit(_bloque_a_csv_trabajador, bloque, numero == 0))
+                    filas += len(bloque)
+                    if len(pendientes) >= 2 * procesos:
+                        f.write(pendientes.popleft().result())
+                while pendientes:
+                    f.write(pendientes.popleft().result())
+    return filas, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predicción del clima por lotes a partir de un CSV")
+    parser.add_argument("entrada", help="CSV con las columnas de weather_prediction.csv")
+    parser.add_argument("salida", help="CSV de salida con las categorías, la predicción y el valor crisp")
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--tabla", action="store_true",
+                        help="Usar la tabla de inferencia precalculada")
+    parser.add_argument("--modelos-cluster", metavar="JSON", default=None,
+                        help="Categorizar con los centroides guardados por cluster.py en lugar de la fuzzificación")
+    parser.add_argument("--inferencia", choices=("nitida",) + GRADED_TNORMS, default="nitida",
+                        help="nitida (categoría de mayor membresía) o graduada con mínimo o producto")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Filas por bloque")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos en paralelo (0 = todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    if args.inferencia != "nitida":
+        if args.tabla or args.modelos_cluster:
+            parser.error("--inferencia graduada no es compatible con --tabla ni con --modelos-cluster")
+        rules = load_graded_rules(args.reglas, args.inferencia)
+    elif args.tabla:
+        rules = cargar_tabla(args.reglas)
+    else:
+        rules = compile_rules(load_rules(args.reglas))
+    procesos = args.procesos or os.cpu_count()
+    modelos_cluster = cargar_modelos(args.modelos_cluster) if args.modelos_cluster else None
+    filas, segundos = predecir_csv(args.entrada, args.salida, rules, args.chunksize, procesos, modelos_cluster)
+    print(f"{filas} filas procesadas en {segundos:.2f} s ({filas / segundos:.0f} filas/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
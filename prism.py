@@ -1,19 +1,20 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 import json  # Importamos el módulo json para manejar archivos JSON
 
-# Paso 1: Cargar el dataset clusterizado
-df = pd.read_csv('weather_prediction_clusterizado.csv', sep=',')
+import instrumentacion
+from cargaDatos import cargar_dataframe
+from reglasBinarias import guardar_reglas_binario
 
-# Paso 2: Preparar los datos
 columnas_cat = ['cloud_cover_cat', 'humidity_cat', 'pressure_cat',
                 'precipitation_cat', 'sunshine_cat', 'temp_mean_cat']
-df_cat = df[columnas_cat + ['Clima']]
-
-# Asegurarse de que los valores sean serializables
-df_cat = df_cat.applymap(lambda x: x.item() if isinstance(x, (np.int64, np.float64)) else x)
 
-# Paso 3: Definir la función PRISM
+# Función PRISM original (implementación de referencia)
+@instrumentacion.cronometrado("prism.entrenamiento")
 def prism(df, class_attr):
     rules = []
     classes = df[class_attr].unique()
@@ -50,7 +51,12 @@ def prism(df, class_attr):
                 if best_condition:
                     rule_conditions.append(best_condition)
                     # Filtrar el dataset para la siguiente iteración
+                    antes = len(df_rule)
                     df_rule = df_rule[df_rule[best_condition[0]] == best_condition[1]]
+                    if instrumentacion.activa:
+                        instrumentacion.contar("prism.pasos")
+                        instrumentacion.contar("prism.filas_evaluadas", antes)
+                        instrumentacion.contar("prism.filas_filtradas", antes - len(df_rule))
                     # Si la regla es 100% precisa, detener
                     if max_prob == 1.0 or len(df_rule[df_rule[class_attr] != target_class]) == 0:
                         break
@@ -58,6 +64,8 @@ def prism(df, class_attr):
                     break  # No se pueden añadir más condiciones
             # Añadir la regla a la lista de reglas
             rules.append((rule_conditions, target_class))
+            if instrumentacion.activa:
+                instrumentacion.contar("prism.reglas")
             # Eliminar las instancias cubiertas por la regla
             df_covered = df_class.copy()
             for condition in rule_conditions:
@@ -66,40 +74,151 @@ def prism(df, class_attr):
             df_class = df_class.drop(df_covered[df_covered[class_attr] == target_class].index)
     return rules
 
-# Paso 4: Ejecutar el algoritmo PRISM
-rules = prism(df_cat, 'Clima')
 
-# Paso 5: Mostrar las reglas generadas
-print("Reglas Generadas por PRISM:")
-rule_number = 0
-for rule_conditions, target_class in rules:
-    rule_number += 1
-    antecedent = ' AND '.join([f"{attr}={val}" for attr, val in rule_conditions])
-    print(f"Regla {rule_number}: SI {antecedent} ENTONCES Clima={target_class}")
-    print("-" * 50)
+# Versión rápida de PRISM. Produce exactamente las mismas reglas, en el mismo
+# orden y con el mismo desempate que prism(), pero en lugar de copiar y filtrar
+# el DataFrame para cada condición candidata trabaja sobre los atributos
+# codificados como enteros: la probabilidad de todas las condiciones de un
+# atributo se obtiene con dos np.bincount sobre las filas aún activas.
+def _codificar(df, columnas):
+    # pd.factorize numera los valores en orden de aparición, el mismo orden en
+    # que prism() recorre df[attr].unique(). El código 0 queda reservado para
+    # los valores nulos, que nunca pueden cumplir una condición.
+    codigos = []
+    valores = []
+    for attr in columnas:
+        codes, uniques = pd.factorize(df[attr])
+        codigos.append(codes + 1)
+        valores.append(uniques)
+    return codigos, valores
+
+
+def _reglas_para_clase(codigos, valores, es_clase, pesos=None):
+    # Con pesos, cada fila cuenta como pesos[fila] filas idénticas: entrenar
+    # sobre las combinaciones distintas con su número de apariciones da las
+    # mismas reglas que entrenar sobre todas las filas
+    rules = []
+    activos = np.ones(len(es_clase), dtype=bool)  # filas de df_class
+    while es_clase[activos].any():
+        rule_conditions = []
+        usados = set()
+        filas = np.flatnonzero(activos)  # filas de df_rule
+        while True:
+            max_prob = 0
+            best_condition = None
+            objetivo_filas = es_clase[filas]
+            for a, codes in enumerate(codigos):
+                if a in usados:
+                    continue  # Evitar reutilizar el mismo atributo
+                codes_filas = codes[filas]
+                minlength = len(valores[a]) + 1
+                if pesos is None:
+                    totales = np.bincount(codes_filas, minlength=minlength).tolist()
+                    objetivos = np.bincount(codes_filas[objetivo_filas], minlength=minlength).tolist()
+                else:
+                    pesos_filas = pesos[filas]
+                    totales = np.bincount(codes_filas, weights=pesos_filas, minlength=minlength).tolist()
+                    objetivos = np.bincount(codes_filas[objetivo_filas], weights=pesos_filas[objetivo_filas],
+                                            minlength=minlength).tolist()
+                for code in range(1, minlength):
+                    if totales[code] == 0:
+                        continue
+                    prob = objetivos[code] / totales[code]
+                    if prob > max_prob:
+                        max_prob = prob
+                        best_condition = (a, code)
+            if best_condition:
+                a, code = best_condition
+                usados.add(a)
+                rule_conditions.append(best_condition)
+                antes = len(filas)
+                filas = filas[codigos[a][filas] == code]
+                if instrumentacion.activa:
+                    instrumentacion.contar("prism.pasos")
+                    instrumentacion.contar("prism.filas_evaluadas", antes)
+                    instrumentacion.contar("prism.filas_filtradas", antes - len(filas))
+                if max_prob == 1.0 or es_clase[filas].all():
+                    break
+            else:
+                break
+        rules.append(rule_conditions)
+        # Las filas que quedan en df_rule son las de df_class que cumplen la
+        # regla: se eliminan las de la clase objetivo
+        activos[filas[es_clase[filas]]] = False
+        if instrumentacion.activa:
+            instrumentacion.contar("prism.reglas")
+            instrumentacion.contar("prism.filas_cubiertas", int(es_clase[filas].sum()))
+    return rules
+
+
+# Datos codificados de cada proceso trabajador en el entrenamiento paralelo
+_datos_trabajador = None
+
+
+def _iniciar_trabajador(codigos, valores, clases):
+    global _datos_trabajador
+    _datos_trabajador = (codigos, valores, clases)
+
+
+def _reglas_para_clase_trabajador(target_class):
+    codigos, valores, clases = _datos_trabajador
+    return _reglas_para_clase(codigos, valores, clases == target_class)
+
+
+@instrumentacion.cronometrado("prism.entrenamiento")
+def prism_rapido(df, class_attr, columnas=None, procesos=1):
+    # Cada clase se entrena de forma independiente (parte siempre de todas las
+    # filas), así que con procesos > 1 cada clase se aprende en un proceso
+    # distinto y las listas se concatenan en el orden original de las clases.
+    columnas = columnas_cat if columnas is None else columnas
+    codigos, valores = _codificar(df, columnas)
+    clases = df[class_attr].to_numpy()
+    target_classes = df[class_attr].unique()
+
+    if procesos > 1 and len(target_classes) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(target_classes)),
+                                 initializer=_iniciar_trabajador,
+                                 initargs=(codigos, valores, clases)) as executor:
+            reglas_por_clase = list(executor.map(_reglas_para_clase_trabajador, target_classes))
+    else:
+        reglas_por_clase = [_reglas_para_clase(codigos, valores, clases == target_class)
+                            for target_class in target_classes]
+
+    rules = []
+    for target_class, reglas_clase in zip(target_classes, reglas_por_clase):
+        for rule_conditions in reglas_clase:
+            conditions = [(columnas[a], valores[a][code - 1]) for a, code in rule_conditions]
+            rules.append((conditions, target_class))
+    return rules
 
-# Paso 6: Guardar las reglas en un archivo JSON
 # Convertir las reglas a un formato serializable
-rules_json = []
-for rule_conditions, target_class in rules:
-    rule_dict = {
-        "antecedent": [{ "attribute": str(attr), "value": int(val) if isinstance(val, (np.int64, np.int32)) else str(val) } for attr, val in rule_conditions],
-        "consequent": { "attribute": "Clima", "value": str(target_class) }
-    }
-    rules_json.append(rule_dict)
+def reglas_a_json(rules):
+    rules_json = []
+    for rule_conditions, target_class in rules:
+        rule_dict = {
+            "antecedent": [{ "attribute": str(attr), "value": int(val) if isinstance(val, (int, np.integer)) else str(val) } for attr, val in rule_conditions],
+            "consequent": { "attribute": "Clima", "value": str(target_class) }
+        }
+        rules_json.append(rule_dict)
+    return rules_json
 
-# Guardar en un archivo JSON
-with open('prism_rules.json', 'w', encoding='utf-8') as f:
-    json.dump(rules_json, f, ensure_ascii=False, indent=4)
+# Convertir las reglas del formato JSON a la lista de (condiciones, clase)
+def reglas_desde_json(rules_json):
+    return [([(c["attribute"], c["value"]) for c in regla["antecedent"]], regla["consequent"]["value"])
+            for regla in rules_json]
 
-print("Las reglas han sido guardadas en el archivo 'prism_rules.json'.")
+# Guardar las reglas en un archivo JSON
+def guardar_reglas_json(rules, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(reglas_a_json(rules), f, ensure_ascii=False, indent=4)
 
-# Opcional: Aplicar las reglas al conjunto de datos y calcular la precisión
+# Aplicar las reglas al conjunto de datos
+@instrumentacion.cronometrado("apply_rules")
 def apply_rules(rules, df):
     predictions = []
     for index, row in df.iterrows():
         predicted = False
-        for rule_conditions, target_class in rules:
+        for position, (rule_conditions, target_class) in enumerate(rules):
             match = True
             for attr, val in rule_conditions:
                 if row[attr] != val:
@@ -108,14 +227,149 @@ def apply_rules(rules, df):
             if match:
                 predictions.append(target_class)
                 predicted = True
+                if instrumentacion.activa:
+                    instrumentacion.contar("apply_rules.reglas_recorridas", position + 1)
                 break
         if not predicted:
             predictions.append(None)
+            if instrumentacion.activa:
+                instrumentacion.contar("apply_rules.reglas_recorridas", len(rules))
+    if instrumentacion.activa:
+        instrumentacion.contar("apply_rules.filas", len(predictions))
     return predictions
 
-# Aplicar las reglas al dataset
-df_cat['Predicción'] = apply_rules(rules, df_cat)
 
-# Calcular la precisión
-accuracy = (df_cat['Clima'] == df_cat['Predicción']).mean()
-print(f"Precisión de las reglas: {accuracy:.2f}")
\ No newline at end of file
+# Evaluación vectorizada de las reglas. Las filas con la misma combinación de
+# valores en los atributos de las reglas se evalúan una sola vez: se construye
+# la matriz de coincidencias combinación x regla (como mucho 4^6 combinaciones
+# para los seis *_cat) y el resultado se reparte a las filas.
+def _matriz_coincidencias(rules, df):
+    attrs = []
+    for rule_conditions, _ in rules:
+        for attr, _ in rule_conditions:
+            if attr not in attrs:
+                attrs.append(attr)
+    if not attrs:
+        return np.ones((1, len(rules)), dtype=bool), np.zeros(len(df), dtype=np.intp)
+
+    inverse = df.groupby(attrs, sort=False, dropna=False).ngroup().to_numpy()
+    combinaciones = df[attrs].drop_duplicates()
+    columnas = {attr: combinaciones[attr].to_numpy() for attr in attrs}
+
+    matches = np.ones((len(combinaciones), len(rules)), dtype=bool)
+    for index, (rule_conditions, _) in enumerate(rules):
+        match = matches[:, index]
+        for attr, val in rule_conditions:
+            match &= columnas[attr] == val
+    return matches, inverse
+
+
+def _primera_coincidencia(matches):
+    # Índice de la primera regla que cumple cada combinación, -1 si ninguna
+    if matches.shape[1] == 0:
+        return np.full(matches.shape[0], -1, dtype=np.intp)
+    first = matches.argmax(axis=1)
+    first[~matches.any(axis=1)] = -1
+    return first
+
+
+@instrumentacion.cronometrado("apply_rules_vectorizado")
+def apply_rules_vectorizado(rules, df):
+    # Mismo resultado que apply_rules (primera regla que se cumple, None si
+    # ninguna) pero trabajando por columnas en lugar de fila a fila
+    matches, inverse = _matriz_coincidencias(rules, df)
+    first = _primera_coincidencia(matches)
+    if instrumentacion.activa:
+        instrumentacion.contar("apply_rules_vectorizado.filas", len(inverse))
+        instrumentacion.contar("apply_rules_vectorizado.combinaciones", len(matches))
+    por_combinacion = np.array([target_class for _, target_class in rules] + [None], dtype=object)
+    return por_combinacion[first][inverse].tolist()
+
+
+def estadisticas_reglas(rules, df, class_attr='Clima'):
+    # Cobertura y precisión de cada regla sobre df:
+    #   cobertura / aciertos: filas que cumplen la regla y, de ellas, las de su
+    #                         clase (sin tener en cuenta el orden de las reglas)
+    #   disparos / aciertos_disparo: filas en las que es la primera regla que se
+    #                         cumple, es decir, las que predice apply_rules
+    matches, inverse = _matriz_coincidencias(rules, df)
+    first = _primera_coincidencia(matches)
+    n_combinaciones = matches.shape[0]
+
+    codigos_clase, clases = pd.factorize(df[class_attr])
+    n_clases = len(clases)
+    # Filas por combinación y clase (la columna extra recoge clases ausentes/nulas)
+    conteos = np.bincount(inverse * (n_clases + 1) + np.where(codigos_clase < 0, n_clases, codigos_clase),
+                          minlength=n_combinaciones * (n_clases + 1)).reshape(n_combinaciones, n_clases + 1)
+    filas = conteos.sum(axis=1)
+
+    indice_clase = {clase: index for index, clase in enumerate(clases)}
+    clase_regla = np.array([indice_clase.get(target_class, n_clases) for _, target_class in rules], dtype=np.intp)
+    conteos[:, n_clases] = 0  # una regla cuya clase no aparece nunca acierta
+    de_su_clase = conteos[:, clase_regla]
+
+    disparos = np.zeros_like(matches)
+    con_regla = first >= 0
+    disparos[np.flatnonzero(con_regla), first[con_regla]] = True
+
+    cobertura = filas @ matches
+    aciertos = (de_su_clase * matches).sum(axis=0)
+    n_disparos = filas @ disparos
+    aciertos_disparo = (de_su_clase * disparos).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'regla': np.arange(1, len(rules) + 1),
+            'clase': [target_class for _, target_class in rules],
+            'condiciones': [len(rule_conditions) for rule_conditions, _ in rules],
+            'cobertura': cobertura,
+            'aciertos': aciertos,
+            'precision': aciertos / cobertura,
+            'disparos': n_disparos,
+            'aciertos_disparo': aciertos_disparo,
+            'precision_disparo': aciertos_disparo / n_disparos,
+        })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inducción de reglas PRISM sobre el dataset clusterizado")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos para entrenar las clases en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--estadisticas", metavar="CSV",
+                        help="Guardar la cobertura y precisión de cada regla en este CSV")
+    args = parser.parse_args(argv)
+
+    # Paso 1 y 2: Cargar solo las columnas necesarias del dataset clusterizado
+    # (tipos compactos y caché columnar, ver cargaDatos.py). reglas_a_json ya
+    # convierte los escalares de NumPy, así que no hace falta recorrer las celdas.
+    df_cat = cargar_dataframe('weather_prediction_clusterizado.csv', columnas_cat + ['Clima'])
+
+    # Paso 3: Ejecutar el algoritmo PRISM
+    rules = prism_rapido(df_cat, 'Clima', procesos=args.procesos or os.cpu_count())
+
+    # Paso 4: Mostrar las reglas generadas
+    print("Reglas Generadas por PRISM:")
+    rule_number = 0
+    for rule_conditions, target_class in rules:
+        rule_number += 1
+        antecedent = ' AND '.join([f"{attr}={val}" for attr, val in rule_conditions])
+        print(f"Regla {rule_number}: SI {antecedent} ENTONCES Clima={target_class}")
+        print("-" * 50)
+
+    # Paso 5: Guardar las reglas en un archivo JSON (legible) y en formato
+    # binario (carga rápida, ver reglasBinarias.py)
+    guardar_reglas_json(rules, 'prism_rules.json')
+    guardar_reglas_binario(reglas_a_json(rules), 'prism_rules.bin')
+    print("Las reglas han sido guardadas en el archivo 'prism_rules.json'.")
+
+    # Opcional: Aplicar las reglas al dataset y calcular la precisión
+    df_cat['Predicción'] = apply_rules_vectorizado(rules, df_cat)
+    accuracy = (df_cat['Clima'] == df_cat['Predicción']).mean()
+    print(f"Precisión de las reglas: {accuracy:.2f}")
+
+    if args.estadisticas:
+        estadisticas_reglas(rules, df_cat, 'Clima').to_csv(args.estadisticas, index=False)
+        print(f"Estadísticas por regla guardadas en '{args.estadisticas}'.")
+
+
+if __name__ == "__main__":
+    main()
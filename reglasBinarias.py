@@ -0,0 +1,141 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+# Formato binario compacto para las reglas PRISM, alternativo al JSON indentado
+# (que se mantiene como exportación legible). El archivo contiene:
+#
+#   b"PRISMRB1"              firma de 8 bytes
+#   uint32 (little endian)   longitud de la cabecera
+#   cabecera JSON            atributos, clases, número de reglas y condiciones
+#   relleno hasta múltiplo de 8 bytes y, uno tras otro (alineados a 8 bytes):
+#     offsets        int32[n_reglas + 1]  condiciones de la regla i: offsets[i]:offsets[i+1]
+#     attribute_ids  int16[n_condiciones] índice en la lista de atributos
+#     values         int32[n_condiciones] valor exigido (código de cluster)
+#     class_ids      int16[n_reglas]      índice en la lista de clases
+#
+# Al leerlo los arrays son vistas sobre un mapeo en memoria del archivo, sin
+# ningún análisis sintáctico.
+#
+# Uso (convertir un JSON existente):
+#     python reglasBinarias.py prism_rules.json prism_rules.bin
+
+FIRMA = b"PRISMRB1"
+ARRAYS = [("offsets", np.int32), ("attribute_ids", np.int16), ("values", np.int32), ("class_ids", np.int16)]
+
+
+def _alinear(n, alineacion=8):
+    return (n + alineacion - 1) // alineacion * alineacion
+
+
+def reglas_a_arrays(rules):
+    # rules: lista de reglas con el formato de prism_rules.json
+    attributes = []
+    classes = []
+    offsets = [0]
+    attribute_ids = []
+    values = []
+    class_ids = []
+    for rule in rules:
+        for antecedent in rule["antecedent"]:
+            attr = antecedent["attribute"]
+            value = antecedent["value"]
+            if isinstance(value, bool) or not isinstance(value, (int, np.integer)):
+                raise ValueError(f"El formato binario solo admite valores enteros: {attr}={value!r}")
+            if attr not in attributes:
+                attributes.append(attr)
+            attribute_ids.append(attributes.index(attr))
+            values.append(int(value))
+        offsets.append(len(values))
+        consequent = rule["consequent"]["value"]
+        if consequent not in classes:
+            classes.append(consequent)
+        class_ids.append(classes.index(consequent))
+    return {
+        "attributes": attributes,
+        "classes": classes,
+        "offsets": np.array(offsets, dtype=np.int32),
+        "attribute_ids": np.array(attribute_ids, dtype=np.int16),
+        "values": np.array(values, dtype=np.int32),
+        "class_ids": np.array(class_ids, dtype=np.int16),
+    }
+
+
+def arrays_a_reglas(attributes, classes, offsets, attribute_ids, values, class_ids):
+    # Operación inversa, para volver a exportar a JSON
+    rules = []
+    offsets = np.asarray(offsets).tolist()
+    attribute_ids = np.asarray(attribute_ids).tolist()
+    values = np.asarray(values).tolist()
+    for index, class_id in enumerate(np.asarray(class_ids).tolist()):
+        start, end = offsets[index], offsets[index + 1]
+        rules.append({
+            "antecedent": [{"attribute": attributes[attr_id], "value": value}
+                           for attr_id, value in zip(attribute_ids[start:end], values[start:end])],
+            "consequent": {"attribute": "Clima", "value": classes[class_id]},
+        })
+    return rules
+
+
+def guardar_reglas_binario(rules, filename):
+    arrays = reglas_a_arrays(rules)
+    cabecera = json.dumps({
+        "attributes": arrays["attributes"],
+        "classes": arrays["classes"],
+        "n_reglas": len(arrays["class_ids"]),
+        "n_condiciones": len(arrays["values"]),
+    }, ensure_ascii=False).encode("utf-8")
+
+    with open(filename, "wb") as f:
+        f.write(FIRMA)
+        f.write(np.uint32(len(cabecera)).tobytes())
+        f.write(cabecera)
+        posicion = len(FIRMA) + 4 + len(cabecera)
+        for nombre, dtype in ARRAYS:
+            f.write(b"\0" * (_alinear(posicion) - posicion))
+            posicion = _alinear(posicion)
+            datos = np.ascontiguousarray(arrays[nombre], dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+            f.write(datos)
+            posicion += len(datos)
+
+
+def leer_reglas_binario(filename):
+    buffer = np.memmap(filename, dtype=np.uint8, mode="r")
+    if bytes(buffer[:len(FIRMA)]) != FIRMA:
+        raise ValueError(f"'{filename}' no es un archivo de reglas binario")
+    longitud = int(np.frombuffer(buffer, dtype="<u4", count=1, offset=len(FIRMA))[0])
+    inicio = len(FIRMA) + 4
+    cabecera = json.loads(bytes(buffer[inicio:inicio + longitud]).decode("utf-8"))
+
+    tamanos = {
+        "offsets": cabecera["n_reglas"] + 1,
+        "attribute_ids": cabecera["n_condiciones"],
+        "values": cabecera["n_condiciones"],
+        "class_ids": cabecera["n_reglas"],
+    }
+    resultado = {"attributes": cabecera["attributes"], "classes": cabecera["classes"]}
+    posicion = inicio + longitud
+    for nombre, dtype in ARRAYS:
+        posicion = _alinear(posicion)
+        dtype = np.dtype(dtype).newbyteorder("<")
+        resultado[nombre] = np.frombuffer(buffer, dtype=dtype, count=tamanos[nombre], offset=posicion)
+        posicion += tamanos[nombre] * dtype.itemsize
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convertir reglas PRISM de JSON a formato binario")
+    parser.add_argument("entrada", help="Archivo JSON de reglas (prism_rules.json)")
+    parser.add_argument("salida", help="Archivo binario de salida (por ejemplo prism_rules.bin)")
+    args = parser.parse_args(argv)
+
+    with open(args.entrada, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    guardar_reglas_binario(rules, args.salida)
+    print(f"{len(rules)} reglas convertidas a '{args.salida}'.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
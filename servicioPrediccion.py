@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from logicaDifusa import (GRADED_TNORMS, INPUT_VARIABLES, GradedRules, compile_rules, fuzzify_batch,
+                          load_graded_rules, load_rules, predict_batch)
+from tablaInferencia import cargar_tabla
+
+# Servicio HTTP/JSON de predicción (solo biblioteca estándar + numpy).
+#
+#   POST /predict   cuerpo: un objeto con las seis variables o una lista de
+#                   objetos. Responde {"prediccion", "valor_crisp"} (o una lista).
+#   GET  /metrics   latencia p50/p99, peticiones, predicciones, tamaño medio
+#                   de lote y rendimiento.
+#
+# Las reglas se cargan una sola vez al arrancar. Las peticiones concurrentes
+# se acumulan en una cola y se procesan en lotes (como mucho --lote-maximo
+# filas o --espera-ms milisegundos de espera) con el camino vectorizado
+# fuzzify_batch -> predict_batch (o la tabla precalculada con --tabla), que da
+# el mismo resultado que fuzzify_inputs -> infer_consequent ->
+# aggregate_results -> defuzzify_results fila a fila. Con --inferencia
+# min|product se usa la inferencia difusa graduada.
+#
+# Uso:
+#     python servicioPrediccion.py --puerto 8000
+#     curl -X POST localhost:8000/predict -d '{"humidity": 80, "cloud_cover": 6, "pressure": 1010,
+#          "precipitation": 5, "sunshine": 20, "temp_mean": 10}'
+
+ESTADOS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+CUERPO_MAXIMO = 1 << 20
+
+
+class PeticionInvalida(ValueError):
+    pass
+
+
+def leer_entradas(cuerpo):
+    # Devuelve (lista de filas, si la petición era una lista)
+    try:
+        datos = json.loads(cuerpo)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise PeticionInvalida(f"JSON no válido: {e}")
+    es_lista = isinstance(datos, list)
+    filas = datos if es_lista else [datos]
+    for fila in filas:
+        if not isinstance(fila, dict):
+            raise PeticionInvalida("Cada entrada debe ser un objeto con las variables " + ", ".join(INPUT_VARIABLES))
+        faltan = [var for var in INPUT_VARIABLES if var not in fila]
+        if faltan:
+            raise PeticionInvalida(f"Faltan variables: {', '.join(faltan)}")
+        for var in INPUT_VARIABLES:
+            if isinstance(fila[var], bool) or not isinstance(fila[var], (int, float)):
+                raise PeticionInvalida(f"'{var}' debe ser un número")
+            # json.loads acepta NaN e Infinity, que fuzzify_batch no rechaza
+            try:
+                finito = math.isfinite(fila[var])
+            except OverflowError:
+                finito = False
+            if not finito:
+                raise PeticionInvalida(f"'{var}' debe ser un número finito")
+    return filas, es_lista
+
+
+def leer_longitud(cabeceras, maximo=CUERPO_MAXIMO):
+    # Content-Length como entero no negativo; devuelve (estado de error, longitud)
+    valor = cabeceras.get('content-length', '') or '0'
+    if not valor.isascii() or not valor.isdigit():
+        return 400, None
+    longitud = int(valor)
+    if longitud > maximo:
+        return 413, None
+    return None, longitud
+
+
+class Metricas:
+    def __init__(self, ventana=10_000):
+        self.inicio = time.perf_counter()
+        self.latencias = deque(maxlen=ventana)  # segundos de las últimas peticiones
+        self.peticiones = 0
+        self.predicciones = 0
+        self.lotes = 0
+        self.errores = 0
+        self.recientes = deque()  # (instante, filas) del último minuto
+
+    def registrar_lote(self, filas):
+        self.lotes += 1
+        self.predicciones += filas
+        ahora = time.perf_counter()
+        self.recientes.append((ahora, filas))
+        while self.recientes and self.recientes[0][0] < ahora - 60:
+            self.recientes.popleft()
+
+    def registrar_peticion(self, segundos):
+        self.peticiones += 1
+        self.latencias.append(segundos)
+
+    def resumen(self):
+        activo = time.perf_counter() - self.inicio
+        latencias = np.array(self.latencias) * 1000
+        p50, p99 = np.percentile(latencias, [50, 99]).tolist() if len(latencias) else (None, None)
+        ventana = min(activo, 60)
+        return {
+            "segundos_activo": round(activo, 3),
+            "peticiones": self.peticiones,
+            "predicciones": self.predicciones,
+            "errores": self.errores,
+            "lotes": self.lotes,
+            "filas_por_lote": round(self.predicciones / self.lotes, 2) if self.lotes else None,
+            "latencia_p50_ms": p50,
+            "latencia_p99_ms": p99,
+            "predicciones_por_segundo": round(self.predicciones / activo, 2) if activo else None,
+            "predicciones_por_segundo_ultimo_minuto":
+                round(sum(filas for _, filas in self.recientes) / ventana, 2) if ventana else None,
+        }
+
+
+class Agrupador:
+    # Junta las filas de las peticiones que llegan mientras se procesa el lote
+    # anterior. La inferencia se ejecuta en un hilo para que el bucle de
+    # eventos siga aceptando peticiones, que formarán el siguiente lote.
+    def __init__(self, rules, metricas, lote_maximo=256, espera=0.002):
+        self.rules = rules
+        self.metricas = metricas
+        self.lote_maximo = lote_maximo
+        self.espera = espera
+        self.cola = asyncio.Queue()
+        self.tarea = None
+
+    def iniciar(self):
+        self.tarea = asyncio.get_running_loop().create_task(self._procesar())
+
+    async def predecir(self, filas):
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((filas, futuro))
+        return await futuro
+
+    def _predecir_lote(self, filas):
+        datos = {var: np.array([fila[var] for fila in filas], dtype=np.float64) for var in INPUT_VARIABLES}
+        memberships, categorias = fuzzify_batch(datos)
+        if isinstance(self.rules, GradedRules):
+            predicciones, crisp = self.rules.predict(memberships)
+        elif hasattr(self.rules, 'predict'):
+            predicciones, crisp = self.rules.predict(categorias)
+        else:
+            predicciones, crisp = predict_batch(categorias, self.rules)
+        return [{"prediccion": str(p), "valor_crisp": None if np.isnan(c) else float(c)}
+                for p, c in zip(predicciones, crisp)]
+
+    async def _procesar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self.cola.get()]
+            filas = len(pendientes[0][0])
+            limite = loop.time() + self.espera
+            while filas < self.lote_maximo:
+                try:
+                    pendiente = self.cola.get_nowait() if self.espera <= 0 else \
+                        await asyncio.wait_for(self.cola.get(), max(limite - loop.time(), 0))
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                pendientes.append(pendiente)
+                filas += len(pendiente[0])
+
+            lote = [fila for filas_peticion, _ in pendientes for fila in filas_peticion]
+            try:
+                resultados = await loop.run_in_executor(None, self._predecir_lote, lote)
+            except Exception as e:
+                for _, futuro in pendientes:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            self.metricas.registrar_lote(len(lote))
+            posicion = 0
+            for filas_peticion, futuro in pendientes:
+                if not futuro.done():
+                    futuro.set_result(resultados[posicion:posicion + len(filas_peticion)])
+                posicion += len(filas_peticion)
+
+
+class Servicio:
+    def __init__(self, rules, lote_maximo=256, espera=0.002, cuerpo_maximo=CUERPO_MAXIMO):
+        self.metricas = Metricas()
+        self.cuerpo_maximo = cuerpo_maximo
+        self.agrupador = Agrupador(rules, self.metricas, lote_maximo, espera)
+
+    async def responder(self, escritor, estado, contenido, mantener):
+        cuerpo = json.dumps(contenido, ensure_ascii=False).encode('utf-8')
+        cabecera = (f"HTTP/1.1 {estado} {ESTADOS[estado]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+        escritor.write(cabecera.encode('latin-1') + cuerpo)
+        await escritor.drain()
+
+    async def atender(self, metodo, ruta, cuerpo):
+        if ruta == '/metrics':
+            if metodo != 'GET':
+                return 405, {"error": "Usa GET"}
+            return 200, self.metricas.resumen()
+        if ruta == '/predict':
+            if metodo != 'POST':
+                return 405, {"error": "Usa POST"}
+            inicio = time.perf_counter()
+            try:
+                filas, es_lista = leer_entradas(cuerpo)
+            except PeticionInvalida as e:
+                return 400, {"error": str(e)}
+            resultados = await self.agrupador.predecir(filas) if filas else []
+            self.metricas.registrar_peticion(time.perf_counter() - inicio)
+            return 200, resultados if es_lista else resultados[0]
+        return 404, {"error": f"Ruta desconocida: {ruta}"}
+
+    async def conexion(self, lector, escritor):
+        # HTTP/1.1 mínimo con conexiones persistentes
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, version = linea.decode('latin-1').split()
+                except ValueError:
+                    await self.responder(escritor, 400, {"error": "Línea de petición no válida"}, False)
+                    break
+                cabeceras = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = linea.decode('latin-1').partition(':')
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                mantener = cabeceras.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                error, longitud = leer_longitud(cabeceras, self.cuerpo_maximo)
+                if error == 400:
+                    await self.responder(escritor, 400, {"error": "Content-Length no válido"}, False)
+                    break
+                if error == 413:
+                    await self.responder(escritor, 413, {"error": "Cuerpo demasiado grande"}, False)
+                    break
+                cuerpo = await lector.readexactly(longitud) if longitud else b''
+
+                try:
+                    estado, contenido = await self.atender(metodo, ruta.split('?')[0], cuerpo)
+                except Exception as e:
+                    estado, contenido = 500, {"error": str(e)}
+                if estado >= 400:
+                    self.metricas.errores += 1
+                await self.responder(escritor, estado, contenido, mantener)
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    async def ejecutar(self, host, puerto):
+        self.agrupador.iniciar()
+        servidor = await asyncio.start_server(self.conexion, host, puerto)
+        print(f"Servicio de predicción escuchando en http://{host}:{puerto}", flush=True)
+        async with servidor:
+            await servidor.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de predicción del clima")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--tabla", action="store_true",
+                        help="Usar la tabla de inferencia precalculada (tablaInferencia.py)")
+    parser.add_argument("--inferencia", choices=("nitida",) + GRADED_TNORMS, default="nitida",
+                        help="nitida o inferencia difusa graduada con mínimo o producto")
+    parser.add_argument("--lote-maximo", type=int, default=256, help="Filas como máximo por lote")
+    parser.add_argument("--espera-ms", type=float, default=2.0,
+                        help="Tiempo máximo de espera para completar un lote")
+    parser.add_argument("--cuerpo-maximo", type=int, default=CUERPO_MAXIMO,
+                        help="Tamaño máximo del cuerpo de una petición en bytes")
+    args = parser.parse_args(argv)
+
+    if args.inferencia != "nitida":
+        rules = load_graded_rules(args.reglas, args.inferencia)
+    else:
+        rules = cargar_tabla(args.reglas) if args.tabla else compile_rules(load_rules(args.reglas))
+    servicio = Servicio(rules, args.lote_maximo, args.espera_ms / 1000, args.cuerpo_maximo)
+    try:
+        asyncio.run(servicio.ejecutar(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import hashlib
+import itertools
+import os
+
+import numpy as np
+
+from logicaDifusa import aggregate_results, compile_rules, defuzzify_results, infer_consequent, load_rules
+
+# Tabla de inferencia precalculada. Con seis atributos *_cat de como mucho
+# cuatro valores cada uno solo existen 4^6 = 4096 entradas posibles, así que
+# inferencia + agregación + defuzzificación se calculan una vez para todas y se
+# guardan en arrays: al predecir basta con convertir las categorías en un
+# índice entero. El artefacto guarda la huella SHA-256 del archivo de reglas y
+# se reconstruye automáticamente cuando las reglas cambian.
+#
+# Uso:
+#     python tablaInferencia.py --reglas prism_rules.json
+
+ATRIBUTOS = ['humidity_cat', 'cloud_cover_cat', 'pressure_cat',
+             'precipitation_cat', 'sunshine_cat', 'temp_mean_cat']
+N_CODIGOS = 4
+SIN_PREDICCION = "No prediction"
+
+
+def huella_archivo(filename):
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def ruta_tabla(rules_filename):
+    return os.path.splitext(rules_filename)[0] + '.tabla.npz'
+
+
+class TablaInferencia:
+    def __init__(self, clase, crisp, clases, atributos=ATRIBUTOS, n_codigos=N_CODIGOS, huella=None):
+        self.clase = clase          # código de clase por celda (-1 = sin predicción)
+        self.crisp = crisp          # valor defuzzificado por celda (NaN = sin predicción)
+        self.clases = list(clases)
+        self.atributos = list(atributos)
+        self.n_codigos = n_codigos
+        self.huella = huella
+        self._nombres = np.array(self.clases + [SIN_PREDICCION], dtype=object)
+
+    def indices(self, categories):
+        # Índice de celda de cada fila y máscara de filas válidas. Un código
+        # negativo (lectura nula en fuzzify_batch o en cluster.assign) no tiene
+        # celda: esas filas reciben el índice 0 y quedan fuera de la máscara, y predict les da
+        # "No prediction" igual que predict_batch.
+        # Un código >= n_codigos indica que la tabla se construyó para menos
+        # categorías de las que tienen los datos, y es un error.
+        codes = [np.asarray(categories[attr]) for attr in self.atributos]
+        valid = np.ones(np.shape(codes[0]), dtype=bool)
+        for attr, code in zip(self.atributos, codes):
+            if code.size and code.max() >= self.n_codigos:
+                raise ValueError(f"{attr} tiene códigos >= {self.n_codigos}: la tabla se construyó para "
+                                 f"{self.n_codigos} categorías por atributo")
+            valid &= code >= 0
+        codes = [np.where(valid, code, 0) for code in codes]
+        return np.ravel_multi_index(codes, (self.n_codigos,) * len(self.atributos)), valid
+
+    def predict(self, categories):
+        # Mismo resultado que logicaDifusa.predict_batch: nombre de la clase
+        # (o "No prediction") y valor crisp (NaN si no hay predicción)
+        index, valid = self.indices(categories)
+        clase = np.where(valid, self.clase[index], -1)
+        crisp = np.where(valid, self.crisp[index], np.nan)
+        return self._nombres[clase], crisp
+
+    def guardar(self, filename):
+        np.savez(filename, clase=self.clase, crisp=self.crisp, clases=np.array(self.clases),
+                 atributos=np.array(self.atributos), n_codigos=self.n_codigos,
+                 huella=np.array(self.huella or ''))
+
+    @classmethod
+    def cargar(cls, filename):
+        with np.load(filename) as data:
+            return cls(data['clase'], data['crisp'], data['clases'].tolist(),
+                       data['atributos'].tolist(), int(data['n_codigos']), str(data['huella']))
+
+
+def construir_tabla(rules, atributos=ATRIBUTOS, n_codigos=N_CODIGOS, huella=None):
+    rules = compile_rules(rules)
+    clases = list(dict.fromkeys(rules.consequents))
+    indice_clase = {clase: index for index, clase in enumerate(clases)}
+
+    celdas = n_codigos ** len(atributos)
+    clase = np.full(celdas, -1, dtype=np.int8)
+    crisp = np.full(celdas, np.nan)
+    # itertools.product recorre las combinaciones en el mismo orden (C) que
+    # np.ravel_multi_index, así que la posición coincide con el índice
+    for index, combinacion in enumerate(itertools.product(range(n_codigos), repeat=len(atributos))):
+        results = infer_consequent(dict(zip(atributos, combinacion)), rules)
+        if not results:
+            continue
+        predicted_clima, all_results = aggregate_results(results)
+        clase[index] = indice_clase[predicted_clima]
+        crisp[index] = defuzzify_results(all_results)
+    return TablaInferencia(clase, crisp, clases, atributos, n_codigos, huella)
+
+
+def cargar_tabla(rules_filename, tabla_filename=None):
+    # Devuelve la tabla asociada al archivo de reglas, reconstruyéndola si no
+    # existe o si las reglas han cambiado desde que se generó
+    tabla_filename = tabla_filename or ruta_tabla(rules_filename)
+    huella = huella_archivo(rules_filename)
+    n_codigos = N_CODIGOS
+    if os.path.exists(tabla_filename):
+        tabla = TablaInferencia.cargar(tabla_filename)
+        if tabla.huella == huella:
+            return tabla
+        # Se conserva el número de categorías con el que se construyó (p. ej.
+        # pipeline.py --n-clusters 5)
+        n_codigos = tabla.n_codigos
+    tabla = construir_tabla(load_rules(rules_filename), n_codigos=n_codigos, huella=huella)
+    tabla.guardar(tabla_filename)
+    return tabla
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construir la tabla de inferencia precalculada")
+    parser.add_argument("--reglas", default="prism_rules.json")
+    parser.add_argument("--salida", default=None, help="Por defecto <reglas>.tabla.npz")
+    args = parser.parse_args(argv)
+
+    salida = args.salida or ruta_tabla(args.reglas)
+    tabla = construir_tabla(load_rules(args.reglas), huella=huella_archivo(args.reglas))
+    tabla.guardar(salida)
+    print(f"Tabla de {len(tabla.clase)} celdas guardada en '{salida}' "
+          f"({int((tabla.clase >= 0).sum())} con predicción).")
+
+
+if __name__ == "__main__":
+    main()
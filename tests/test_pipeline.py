@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+import pipeline
+import prism
+from logicaDifusa import load_rules, predict_batch
+from tablaInferencia import TablaInferencia, ruta_tabla
+
+
+def test_tabla_del_pipeline_cubre_n_clusters_distinto_del_defecto(tmp_path):
+    entrada = tmp_path / 'entrada.csv'
+    pd.read_csv('weather_prediction.csv', nrows=3000).to_csv(entrada, index=False)
+    reglas = tmp_path / 'reglas.json'
+    clusterizado = tmp_path / 'clusterizado.csv'
+    pipeline.main(['--entrada', str(entrada), '--clusterizado', str(clusterizado),
+                   '--modelos', str(tmp_path / 'modelos.json'), '--reglas', str(reglas),
+                   '--cache', str(tmp_path / 'cache'), '--metodo', 'exacto', '--n-clusters', '5'])
+
+    tabla = TablaInferencia.cargar(ruta_tabla(str(reglas)))
+    assert tabla.n_codigos == 5
+    df = pd.read_csv(clusterizado)
+    categorias = {columna: df[columna].to_numpy() for columna in prism.columnas_cat}
+    assert max(codigos.max() for codigos in categorias.values()) == 4
+    clase_tabla, crisp_tabla = tabla.predict(categorias)
+    clase_reglas, crisp_reglas = predict_batch(categorias, load_rules(str(reglas)))
+    assert list(clase_tabla) == list(clase_reglas)
+    np.testing.assert_allclose(crisp_tabla, crisp_reglas)
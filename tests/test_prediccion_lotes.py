@@ -0,0 +1,95 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cluster import cargar_modelos
+from logicaDifusa import INPUT_VARIABLES, compile_rules, load_graded_rules, load_rules, predict_batch, predict_graded
+from prediccionLotes import predecir_csv
+from tablaInferencia import ATRIBUTOS, N_CODIGOS, cargar_tabla
+
+ENTRADA = 'weather-prediction-with-climate-extended.csv'
+
+
+def _csv_con_nulos(tmp_path, filas=600):
+    # Bloques de filas con una lectura nula en cada variable de entrada,
+    # seguidos de filas con todas nulas y de filas completas
+    df = pd.read_csv(ENTRADA, nrows=filas)
+    bloque = filas // (len(INPUT_VARIABLES) + 2)
+    for k, var in enumerate(INPUT_VARIABLES):
+        df.loc[k * bloque:(k + 1) * bloque - 1, var] = np.nan
+    df.loc[len(INPUT_VARIABLES) * bloque:(len(INPUT_VARIABLES) + 1) * bloque - 1, INPUT_VARIABLES] = np.nan
+    ruta = tmp_path / 'entrada.csv'
+    df.to_csv(ruta, index=False)
+    return ruta, df[INPUT_VARIABLES].isna().any(axis=1).to_numpy()
+
+
+def _predecir(tmp_path, nombre, rules, modelos_cluster=None):
+    entrada, nulas = _csv_con_nulos(tmp_path)
+    salida = tmp_path / nombre
+    predecir_csv(entrada, salida, rules, modelos_cluster=modelos_cluster)
+    return pd.read_csv(salida), nulas
+
+
+def test_tabla_y_reglas_coinciden_con_lecturas_nulas_y_modelos_cluster(tmp_path):
+    modelos = cargar_modelos('modelos_cluster.json')
+    tabla, nulas = _predecir(tmp_path, 'tabla.csv', cargar_tabla('prism_rules.json'), modelos)
+    reglas, _ = _predecir(tmp_path, 'reglas.csv', load_rules('prism_rules.json'), modelos)
+    pd.testing.assert_frame_equal(tabla, reglas)
+    assert (tabla.loc[nulas, 'Predicción'] == 'No prediction').all()
+    assert tabla.loc[nulas, 'Valor_Crisp'].isna().all()
+    assert (tabla.loc[~nulas, 'Predicción'] != 'No prediction').any()
+
+
+def test_tabla_y_predict_batch_coinciden_en_todas_las_combinaciones_con_codigos_nulos():
+    tabla = cargar_tabla('prism_rules.json')
+    rules = compile_rules(load_rules('prism_rules.json'))
+    codigos = np.array(list(itertools.product(range(-1, N_CODIGOS), repeat=len(ATRIBUTOS))))
+    categorias = {attr: codigos[:, k] for k, attr in enumerate(ATRIBUTOS)}
+    clase_tabla, crisp_tabla = tabla.predict(categorias)
+    clase_reglas, crisp_reglas = predict_batch(categorias, rules)
+    assert list(clase_tabla) == list(clase_reglas)
+    np.testing.assert_array_equal(crisp_tabla, crisp_reglas)
+
+
+def test_tabla_rechaza_codigos_fuera_de_su_dominio():
+    categorias = {attr: np.array([0, N_CODIGOS]) for attr in ATRIBUTOS}
+    with pytest.raises(ValueError):
+        cargar_tabla('prism_rules.json').predict(categorias)
+
+
+def test_lecturas_nulas_sin_prediccion_en_el_camino_difuso(tmp_path):
+    reglas, nulas = _predecir(tmp_path, 'reglas.csv', load_rules('prism_rules.json'))
+    tabla, _ = _predecir(tmp_path, 'tabla.csv', cargar_tabla('prism_rules.json'))
+    graduada, _ = _predecir(tmp_path, 'graduada.csv', load_graded_rules('prism_rules.json'))
+    pd.testing.assert_frame_equal(tabla, reglas)
+    for df in (reglas, graduada):
+        assert (df.loc[nulas, 'Predicción'] == 'No prediction').all()
+        assert df.loc[nulas, 'Valor_Crisp'].isna().all()
+    assert (reglas.loc[nulas, [var + '_cat' for var in INPUT_VARIABLES]].min(axis=1) == -1).all()
+
+
+def test_columnas_cat_en_el_mismo_orden_en_ambos_caminos(tmp_path):
+    difusa, _ = _predecir(tmp_path, 'difusa.csv', load_rules('prism_rules.json'))
+    cluster, _ = _predecir(tmp_path, 'cluster.csv', load_rules('prism_rules.json'),
+                           cargar_modelos('modelos_cluster.json'))
+    assert list(difusa.columns) == list(cluster.columns)
+
+
+def test_inferencia_graduada_con_modelos_cluster_se_rechaza(tmp_path):
+    salida = tmp_path / 'salida.csv'
+    with pytest.raises(ValueError):
+        predecir_csv(_csv_con_nulos(tmp_path)[0], salida, load_graded_rules('prism_rules.json'),
+                     modelos_cluster=cargar_modelos('modelos_cluster.json'))
+    assert not salida.exists()
+
+
+def test_predict_graded_con_binario():
+    datos = pd.read_csv(ENTRADA, nrows=50)
+    clase_json, crisp_json = predict_graded(datos, 'prism_rules.json')
+    clase_bin, crisp_bin = predict_graded(datos, 'prism_rules.bin')
+    assert list(clase_json) == list(clase_bin)
+    np.testing.assert_array_equal(crisp_json, crisp_bin)
+    with pytest.raises(TypeError):
+        predict_graded(datos, load_rules('prism_rules.bin'))
@@ -0,0 +1,28 @@
+import pytest
+
+from servicioPrediccion import CUERPO_MAXIMO, PeticionInvalida, leer_entradas, leer_longitud
+
+FILA = '{"humidity": %s, "cloud_cover": 6, "pressure": 1010, "precipitation": 5, "sunshine": 20, "temp_mean": 10}'
+
+
+@pytest.mark.parametrize("valor", ["NaN", "Infinity", "-Infinity", "1" + "0" * 400])
+def test_rechaza_numeros_no_finitos(valor):
+    with pytest.raises(PeticionInvalida):
+        leer_entradas((FILA % valor).encode())
+
+
+def test_acepta_fila_valida():
+    filas, es_lista = leer_entradas((FILA % 80).encode())
+    assert filas[0]["humidity"] == 80 and not es_lista
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("12", (None, 12)),
+    ("", (None, 0)),
+    ("abc", (400, None)),
+    ("-5", (400, None)),
+    ("1.5", (400, None)),
+    (str(CUERPO_MAXIMO + 1), (413, None)),
+])
+def test_content_length(valor, esperado):
+    assert leer_longitud({"content-length": valor}) == esperado